@@ -21,6 +21,7 @@ setuptools.setup(
         "License :: OSI Approved :: GNU Lesser General Public License v2 or later (LGPLv2+)",
         "Operating System :: OS Independent",
     ],
-    install_requires=['python-dateutil', 'julian', 'memoization'],
+    install_requires=['python-dateutil', 'memoization'],
+    extras_require={'numpy': ['numpy']},
     python_requires='>=3.6'
 )
\ No newline at end of file
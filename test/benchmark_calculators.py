@@ -0,0 +1,52 @@
+import timeit
+from datetime import date, timedelta
+
+from test import test_helper
+from zmanim.util.meeus_calculator import MeeusCalculator
+from zmanim.util.noaa_calculator import NOAACalculator
+from zmanim.util.sun_times_calculator import SunTimesCalculator
+
+# Cost per sunrise and deviation from the full Meeus series for each calculator, scalar and batched.
+# Run with `python -m test.benchmark_calculators`; not collected by the test suite.
+
+DATES = [date(2000, 1, 1) + timedelta(days) for days in range(0, 3653, 3)]
+ZENITH = 90.833333
+REPEAT = 3
+
+
+def calculators():
+    return [('SunTimes', SunTimesCalculator()),
+            ('NOAA', NOAACalculator()),
+            ('Meeus (8 terms)', MeeusCalculator(terms=8)),
+            ('Meeus (20 terms)', MeeusCalculator(terms=20)),
+            ('Meeus (all terms)', MeeusCalculator())]
+
+
+def scalar_cost(calc, geo) -> float:
+    def run():
+        for target_date in DATES:
+            calc.utc_sunrise(target_date, geo, ZENITH)
+    return min(timeit.repeat(run, number=1, repeat=REPEAT)) / len(DATES)
+
+
+def batch_cost(calc, geo) -> float:
+    return min(timeit.repeat(lambda: calc.utc_sunrise_batch(DATES, geo, ZENITH), number=1, repeat=REPEAT)) / len(DATES)
+
+
+def max_deviation(calc, reference, geo) -> float:
+    deviations = [abs(calc.utc_sunrise(target_date, geo, ZENITH) - reference.utc_sunrise(target_date, geo, ZENITH))
+                  for target_date in DATES]
+    return max(deviations) * 3600.0  # seconds
+
+
+def main():
+    geo = test_helper.lakewood()
+    reference = MeeusCalculator()
+    print('%-18s %14s %14s %16s' % ('calculator', 'scalar (us)', 'batch (us)', 'max dev (sec)'))
+    for name, calc in calculators():
+        batch = batch_cost(calc, geo) * 1e6 if test_helper.numpy_available() else float('nan')
+        print('%-18s %14.2f %14.2f %16.3f' % (name, scalar_cost(calc, geo) * 1e6, batch, max_deviation(calc, reference, geo)))
+
+
+if __name__ == '__main__':
+    main()
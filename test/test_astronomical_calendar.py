@@ -1,9 +1,28 @@
+import math
 import unittest
-from datetime import date
+from datetime import date, datetime, time, timedelta
 
 from test import test_helper
 from zmanim.astronomical_calendar import AstronomicalCalendar
+from zmanim.util.geo_location import GeoLocation
+from zmanim.util.horizon_profile import HorizonProfile
 from zmanim.util.math_helper import MathHelper
+from zmanim.util.noaa_calculator import NOAACalculator
+from zmanim.util.sun_times_calculator import SunTimesCalculator
+
+
+class CountingCalculator(NOAACalculator):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def utc_sunrise(self, *args, **kwargs):
+        self.calls += 1
+        return super().utc_sunrise(*args, **kwargs)
+
+    def utc_sunset(self, *args, **kwargs):
+        self.calls += 1
+        return super().utc_sunset(*args, **kwargs)
 
 
 class TestAstronomicalCalendar(unittest.TestCase):
@@ -179,6 +198,136 @@ class TestAstronomicalCalendar(unittest.TestCase):
         result = calc.sunset_offset_by_degrees(94)
         self.assertEqual(result.replace(microsecond=0).isoformat(), "2017-06-22T02:00:16-08:00")
 
+    def test_visible_sunrise_and_sunset(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.jerusalem(), date=date(2017, 10, 17))
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        self.assertEqual(calc.visible_sunrise(profile).replace(microsecond=0).isoformat(), "2017-10-17T06:59:55+03:00")
+        self.assertEqual(calc.visible_sunset(profile).replace(microsecond=0).isoformat(), "2017-10-17T18:05:35+03:00")
+        self.assertLess(abs((calc.visible_sunrise(HorizonProfile.flat()) - calc.sea_level_sunrise()).total_seconds()), 1)
+
+    def test_visible_sunrise_and_sunset_with_sun_times_calculator(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.jerusalem(), date=date(2017, 10, 17), calculator=SunTimesCalculator())
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        self.assertEqual(calc.visible_sunrise(profile).replace(microsecond=0).isoformat(), "2017-10-17T06:59:38+03:00")
+        self.assertEqual(calc.visible_sunset(profile).replace(microsecond=0).isoformat(), "2017-10-17T18:06:13+03:00")
+        self.assertLess(abs((calc.visible_sunrise(HorizonProfile.flat()) - calc.sea_level_sunrise()).total_seconds()), 2)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_visible_sunrise_batch(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.samoa())
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        dates = [date(2017, 10, 15), date(2017, 10, 16), date(2017, 10, 17)]
+        sunrises, sunsets = calc.utc_visible_sunrise_batch(dates, profile), calc.utc_visible_sunset_batch(dates, profile)
+        for target_date, sunrise, sunset in zip(dates, sunrises, sunsets):
+            calc.date = target_date
+            self.assertAlmostEqual(sunrise, calc.astronomical_calculator.utc_visible_sunrise(calc._adjusted_date(), calc.geo_location, profile), places=10)
+            self.assertAlmostEqual(sunset, calc.astronomical_calculator.utc_visible_sunset(calc._adjusted_date(), calc.geo_location, profile), places=10)
+
+    def test_sun_altitude_crossing(self):
+        expected = [('fast', 'sunrise', "2017-10-17T06:42:42-04:00", 1),
+                    ('standard', 'sunrise', "2017-10-17T06:42:27-04:00", 2),
+                    ('converged', 'sunrise', "2017-10-17T06:42:27-04:00", 4),
+                    ('standard', 'sunset', "2017-10-17T18:41:21-04:00", 2)]
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+
+        def test_entry(precision, mode):
+            result, iterations = calc.sun_altitude_crossing(-6, mode, precision)
+            return precision, mode, result.replace(microsecond=0).isoformat(), iterations
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0], entry[1]), entry)
+        self.assertEqual(calc.sun_altitude_crossing(-6)[0], calc.sunrise_offset_by_degrees(96))
+
+    def test_sun_altitude_crossing_at_geometric_horizon(self):
+        for calculator in [NOAACalculator(), SunTimesCalculator()]:
+            calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17), calculator=calculator)
+            for mode in ['sunrise', 'sunset']:
+                horizon = calc.sun_altitude_crossing(0, mode)[0]
+                for altitude in [1e-9, -1e-9]:
+                    self.assertLess(abs((calc.sun_altitude_crossing(altitude, mode)[0] - horizon).total_seconds()), 1e-3)
+            # the sun's center reaches the geometric horizon after the apparent sunrise
+            self.assertEqual(calc.sun_altitude_crossing(0)[0].replace(microsecond=0).isoformat(),
+                             "2017-10-17T07:14:19-04:00" if isinstance(calculator, NOAACalculator) else "2017-10-17T07:13:47-04:00")
+            self.assertGreater(calc.sun_altitude_crossing(0)[0], calc.sea_level_sunrise())
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sunrise_batch_with_sun_times_calculator(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.samoa(), calculator=SunTimesCalculator())
+        dates = [date(2017, 10, 15), date(2017, 10, 16), date(2017, 10, 17)]
+        for target_date, sunrise in zip(dates, calc.utc_sunrise_batch(dates, 90)):
+            calc.date = target_date
+            self.assertAlmostEqual(sunrise, calc.utc_sunrise(90), places=12)
+
+    def test_sun_position_steps(self):
+        for geo in [test_helper.lakewood(), test_helper.samoa(), test_helper.arctic_nunavut()]:
+            calc = AstronomicalCalendar(geo_location=geo, calculator=SunTimesCalculator())
+            steps = list(calc.sun_position_steps(date(2017, 10, 10), date(2017, 10, 20), mode='sunset'))
+            self.assertEqual(len(steps), 11)
+            for target_date, sunset in steps:
+                calc.date = target_date
+                self.assertEqual(sunset, calc.sunset_offset_by_degrees(90))
+
+    def test_sun_position_steps_with_seeding(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood())
+        for target_date, sunrise in calc.sun_position_steps(date(2017, 1, 1), date(2017, 12, 31), AstronomicalCalendar.CIVIL_ZENITH):
+            calc.date = target_date
+            self.assertLessEqual(abs((sunrise - calc.sunrise_offset_by_degrees(96)).total_seconds()), NOAACalculator.STEP_TOLERANCE)
+
+    def test_annual_extremes(self):
+        expected_dates = [("2017-12-07T16:32:03-05:00", "2017-06-27T20:30:54-04:00"),
+                          ("2017-12-03T16:39:25+02:00", "2017-06-30T19:53:17+03:00"),
+                          ("2017-12-04T16:46:45-08:00", "2017-06-29T20:11:37-07:00"),
+                          ("2017-12-05T16:28:59+09:00", "2017-06-29T19:02:29+09:00"),
+                          ("2017-02-24T12:29:24-05:00", "2017-04-06T23:31:41-04:00"),
+                          ("2017-05-31T18:11:57+13:00", "2017-01-22T20:08:43+14:00")]
+        expected = zip(test_helper.basic_locations(), expected_dates)
+        calc = AstronomicalCalendar(date=date(2017, 10, 17))
+
+        def test_entry(geo):
+            calc.geo_location = geo
+            return geo, tuple(result.replace(microsecond=0).isoformat() for result in calc.annual_extremes('sunset'))
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    def test_annual_extremes_match_daily_scan(self):
+        for geo in [test_helper.jerusalem(), test_helper.tokyo(), test_helper.arctic_nunavut()]:
+            for zman in ['sea_level_sunrise', 'sun_transit']:
+                calc = AstronomicalCalendar(geo_location=geo)
+                evaluations = []
+
+                def counting_zman(calendar):
+                    evaluations.append(calendar.date)
+                    return getattr(calendar, zman)()
+
+                extremes = calc.annual_extremes(counting_zman, 2017)
+                self.assertLess(len(evaluations), 100)
+
+                results = []
+                for days in range(365):
+                    calc.date = date(2017, 1, 1) + timedelta(days)
+                    result = getattr(calc, zman)()
+                    if result is not None:
+                        results.append(((result.replace(tzinfo=None) - datetime.combine(calc.date, time())).total_seconds(), result))
+                self.assertEqual(extremes, (min(results)[1], max(results)[1]))
+
+    def test_annual_extremes_without_events(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.arctic_nunavut())
+        self.assertEqual(calc.annual_extremes(lambda calendar: None, 2017), (None, None))
+
+    def test_day_length_extremes(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        shortest, longest = calc.day_length_extremes()
+        self.assertEqual((shortest[0], round(shortest[1].total_seconds())), (date(2017, 12, 21), 33556))
+        self.assertEqual((longest[0], round(longest[1].total_seconds())), (date(2017, 6, 20), 54087))
+
+    def test_sun_event_type(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.arctic_nunavut(), date=date(2017, 10, 17))
+        self.assertEqual(calc.sun_event_type(90), AstronomicalCalendar().astronomical_calculator.SUN_EVENTS.always_below)
+        self.assertEqual(calc.sun_event_type(102, 'sunset').name, 'event')
+        calc.date = date(2017, 6, 21)
+        self.assertEqual(calc.sun_event_type(90).name, 'always_above')
+
     def test_temporal_hour(self):
         expected_lengths = [0.92239132, 0.94567431, 0.93889721, 0.93666451, None, 1.03504709]
         expected = zip(test_helper.basic_locations(), expected_lengths)
@@ -193,6 +342,24 @@ class TestAstronomicalCalendar(unittest.TestCase):
             self.assertEqual(test_entry(entry[0]), entry)
 
     def test_sun_transit(self):
+        expected_dates = ["2017-10-17T12:42:18-04:00",
+                          "2017-10-17T12:24:28+03:00",
+                          "2017-10-17T12:40:05-07:00",
+                          "2017-10-17T11:26:55+09:00",
+                          "2017-10-17T12:04:32-04:00",
+                          "2017-10-17T13:12:43+14:00"]
+        expected = zip(test_helper.basic_locations(), expected_dates)
+        calc = AstronomicalCalendar(date=date(2017, 10, 17))
+
+        def test_entry(geo):
+            calc.geo_location = geo
+            result = calc.sun_transit()
+            return geo, (None if result is None else result.replace(microsecond=0).isoformat())
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    def test_sun_transit_between_day_start_and_end(self):
         expected_dates = ["2017-10-17T12:41:55-04:00",
                           "2017-10-17T12:24:09+03:00",
                           "2017-10-17T12:39:45-07:00",
@@ -204,12 +371,116 @@ class TestAstronomicalCalendar(unittest.TestCase):
 
         def test_entry(geo):
             calc.geo_location = geo
-            result = calc.sun_transit()
+            result = calc.sun_transit(calc.sea_level_sunrise(), calc.sea_level_sunset())
             return geo, (None if result is None else result.replace(microsecond=0).isoformat())
 
         for entry in expected:
             self.assertEqual(test_entry(entry[0]), entry)
 
+    def test_solar_midnight(self):
+        expected_dates = ["2017-10-18T00:42:12-04:00",
+                          "2017-10-18T00:24:22+03:00",
+                          "2017-10-18T00:39:59-07:00",
+                          "2017-10-17T23:26:48+09:00",
+                          "2017-10-18T00:04:26-04:00",
+                          "2017-10-18T01:12:36+14:00"]
+        expected = zip(test_helper.basic_locations(), expected_dates)
+        calc = AstronomicalCalendar(date=date(2017, 10, 17))
+
+        def test_entry(geo):
+            calc.geo_location = geo
+            result = calc.solar_midnight()
+            return geo, (None if result is None else result.replace(microsecond=0).isoformat())
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    def test_utc_solar_noon_and_midnight(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        self.assertEqual(round(calc.utc_solar_noon(), 8), round(calc.astronomical_calculator.utc_solar_noon(date(2017, 10, 17), calc.geo_location), 8))
+        self.assertAlmostEqual((calc.utc_solar_midnight() - calc.utc_solar_noon()) % 24, 12, places=2)
+
+    def test_solar_noon_near_the_antimeridian(self):
+        calc = AstronomicalCalendar(date=date(2017, 6, 21))
+        for longitude, time_zone in [(179.5, 'Etc/GMT-12'), (-179.5, 'Etc/GMT+12'), (179.5, 'Etc/GMT+12'), (-179.5, 'Etc/GMT-12')]:
+            calc.geo_location = GeoLocation('Sample', 0, longitude, time_zone)
+            self.assertEqual(calc.solar_noon().date(), date(2017, 6, 21))
+            self.assertAlmostEqual((calc.solar_midnight() - calc.solar_noon()).total_seconds() / 3600, 12, places=2)
+
+    def test_sun_positions_are_memoized(self):
+        calculator = CountingCalculator()
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17), calculator=calculator)
+        sunrise = calc.sea_level_sunrise()
+        calc.temporal_hour()
+        calc.sun_transit()
+        calc.utc_sea_level_sunrise(90)
+        self.assertIs(calc.sea_level_sunrise(), sunrise)
+        self.assertEqual(calculator.calls, 2)
+        calc.sunrise()
+        calc.sunrise_offset_by_degrees(102)
+        calc.sunrise_offset_by_degrees(102)
+        self.assertEqual(calculator.calls, 4)
+
+    def test_memoized_sun_positions_are_cleared_on_reassignment(self):
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        lakewood_sunset = calc.sunset()
+        calc.geo_location = test_helper.jerusalem()
+        jerusalem_sunset = calc.sunset()
+        self.assertEqual(jerusalem_sunset.replace(microsecond=0).isoformat(), "2017-10-17T18:08:46+03:00")
+        calc.date = date(2017, 10, 18)
+        self.assertNotEqual(calc.sunset(), jerusalem_sunset)
+        calc.astronomical_calculator = SunTimesCalculator()
+        calc.date = date(2017, 10, 17)
+        self.assertNotEqual(calc.sunset(), jerusalem_sunset)
+        calc.geo_location = test_helper.lakewood()
+        calc.astronomical_calculator = NOAACalculator()
+        self.assertEqual(calc.sunset(), lakewood_sunset)
+
+    def test_timestamp_output_mode(self):
+        for geo in test_helper.basic_locations() + [test_helper.samoa(), test_helper.hooper_bay()]:
+            for target_date in [date(2017, 3, 12), date(2017, 6, 21), date(2017, 10, 17), date(2017, 12, 21)]:
+                calc = AstronomicalCalendar(geo_location=geo, date=target_date)
+                timestamps = AstronomicalCalendar(geo_location=geo, date=target_date, output_mode='timestamp')
+                for method in ['sunrise', 'sea_level_sunset', 'solar_noon', 'solar_midnight', 'sun_transit']:
+                    expected = getattr(calc, method)()
+                    result = getattr(timestamps, method)()
+                    if expected is None:
+                        self.assertIsNone(result)
+                    else:
+                        self.assertIsInstance(result, float)
+                        self.assertAlmostEqual(result, expected.timestamp(), delta=2e-6)
+                        self.assertEqual(timestamps.date_time_from_timestamp(result).utcoffset(), expected.utcoffset())
+                self.assertAlmostEqual(timestamps.temporal_hour(), calc.temporal_hour(), delta=1e-3)
+
+    def test_output_mode_is_validated(self):
+        with self.assertRaises(ValueError):
+            AstronomicalCalendar(output_mode='epoch')
+        calc = AstronomicalCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        sunset = calc.sunset()
+        calc.output_mode = 'timestamp'
+        self.assertAlmostEqual(calc.sunset(), sunset.timestamp(), delta=1e-6)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sun_position_batches(self):
+        dates = [date(2017, 10, 17), date(2017, 6, 21), date(2017, 12, 21)]
+        calc = AstronomicalCalendar()
+
+        def test_entry(geo, batch_method, scalar_method, zenith):
+            calc.geo_location = geo
+            results = []
+            for target_date, result in zip(dates, getattr(calc, batch_method)(dates, zenith)):
+                calc.date = target_date
+                expected = getattr(calc, scalar_method)(zenith)
+                results.append((None if math.isnan(result) else round(result, 8),
+                                None if expected is None else round(expected, 8)))
+            return results
+
+        for geo in test_helper.basic_locations():
+            for batch_method, zenith in [('utc_sunrise_batch', 90), ('utc_sea_level_sunrise_batch', 102),
+                                         ('utc_sunset_batch', 90), ('utc_sea_level_sunset_batch', 102)]:
+                for result, expected in test_entry(geo, batch_method, batch_method.replace('_batch', ''), zenith):
+                    self.assertEqual(result, expected)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
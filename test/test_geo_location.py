@@ -100,6 +100,49 @@ class TestGeoLocation(unittest.TestCase):
         geo.time_zone = 'America/New_York'
         self.assertEqual(geo.standard_time_offset(), -5 * GeoLocation.HOUR_MILLIS)
 
+    def test_standard_time_offset_is_cached_per_time_zone(self):
+        geo = test_helper.samoa()
+        self.assertEqual(geo.standard_time_offset(), 13 * GeoLocation.HOUR_MILLIS)
+        self.assertEqual(geo.antimeridian_adjustment(), -1)
+        geo.time_zone = 'Pacific/Pago_Pago'
+        self.assertEqual(geo.standard_time_offset(), -11 * GeoLocation.HOUR_MILLIS)
+        self.assertEqual(geo.antimeridian_adjustment(), 0)
+
+    def test_local_mean_time_offset_follows_longitude(self):
+        geo = GeoLocation('Sample', 40, -75, 'America/New_York')
+        self.assertEqual(geo.local_mean_time_offset(), 0)
+        geo.longitude = -74
+        self.assertEqual(geo.local_mean_time_offset(), 1 * 4 * GeoLocation.MINUTE_MILLIS)
+
+    def test_standard_time_offset_at(self):
+        expected = [('2017-07-01', 'America/New_York', -5),
+                    ('2017-01-01', 'America/New_York', -5),
+                    ('1945-06-01', 'America/New_York', -5),
+                    ('2011-12-29', 'Pacific/Apia', -11),
+                    ('2011-12-31', 'Pacific/Apia', 13),
+                    ('2017-03-24', 'Asia/Jerusalem', 2),
+                    ('2400-01-01', 'Asia/Jerusalem', 2)]
+
+        def test_entry(target_date, tz):
+            geo = GeoLocation('Sample', 0, 0, tz)
+            return target_date, tz, geo.standard_time_offset_at(parser.parse(target_date).date()) / GeoLocation.HOUR_MILLIS
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0], entry[1]), entry)
+
+    def test_utc_offset_transitions(self):
+        geo = GeoLocation('Sample', 0, 0, 'America/New_York')
+        start, end = parser.parse('2017-01-01').date(), parser.parse('2017-12-31').date()
+        self.assertEqual([(d.isoformat(), offset / GeoLocation.HOUR_MILLIS) for d, offset in geo.utc_offset_transitions(start, end)],
+                         [('2017-01-01', -5), ('2017-03-12', -4), ('2017-11-05', -5)])
+        self.assertEqual([(d.isoformat(), offset / GeoLocation.HOUR_MILLIS) for d, offset in geo.utc_offset_transitions(start, end, False)],
+                         [('2017-01-01', -5)])
+
+        geo = GeoLocation('Sample', 0, 0, 'Pacific/Apia')
+        start, end = parser.parse('2011-12-01').date(), parser.parse('2011-12-31').date()
+        self.assertEqual([(d.isoformat(), offset / GeoLocation.HOUR_MILLIS) for d, offset in geo.utc_offset_transitions(start, end, False)],
+                         [('2011-12-01', -11), ('2011-12-31', 13)])  # 2011-12-30 was skipped
+
     def test_time_zone_offset_at(self):
         expected = [('2017-03-12T06:30:00Z', 'US/Eastern', -5),
                     ('2017-03-12T07:00:00Z', 'US/Eastern', -4),
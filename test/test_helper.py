@@ -2,6 +2,14 @@ from zmanim.hebrew_calendar.jewish_calendar import JewishCalendar
 from zmanim.util.geo_location import GeoLocation
 
 
+def numpy_available():
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+
 def lakewood():
     return GeoLocation('Lakewood, NJ', 40.0721087, -74.2400243, 'America/New_York', elevation=15)
 
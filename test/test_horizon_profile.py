@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from test import test_helper
+from zmanim.util.horizon_profile import HorizonProfile
+
+
+class TestHorizonProfile(unittest.TestCase):
+    def setUp(self):
+        HorizonProfile.clear_cache()
+
+    def test_elevation_at(self):
+        profile = HorizonProfile([1.0, 4.0, 0.5, -0.5])
+        expected = [(0, 1.0), (90, 4.0), (45, 2.5), (135, 2.25), (315, 0.25), (360, 1.0), (-45, 0.25), (450, 4.0)]
+
+        def test_entry(azimuth):
+            return azimuth, round(profile.elevation_at(azimuth), 8)
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    def test_flat(self):
+        profile = HorizonProfile.flat(0.25)
+        self.assertEqual([profile.elevation_at(azimuth) for azimuth in [0, 123.4, 359.9]], [0.25, 0.25, 0.25])
+
+    def test_from_samples(self):
+        profile = HorizonProfile.from_samples([(90, 4), (0, 1), (270, -0.5)], bins=8)
+        self.assertEqual(len(profile.elevations), 8)
+        self.assertEqual(profile.elevations, (1.0, 2.5, 4.0, 2.875, 1.75, 0.625, -0.5, 0.25))
+        self.assertEqual((profile.min_elevation, profile.max_elevation), (-0.5, 4.0))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_elevation_at_array(self):
+        import numpy as np
+
+        profile = HorizonProfile.from_samples([(90, 4), (0, 1), (270, -0.5), (200, 2)], bins=36)
+        azimuths = np.linspace(-720, 720, 997)
+        self.assertEqual([round(elevation, 10) for elevation in profile.elevation_at_array(azimuths)],
+                         [round(profile.elevation_at(azimuth), 10) for azimuth in azimuths])
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'horizon.txt')
+            with open(path, 'w') as file:
+                file.write("# azimuth elevation\n0 1.0\n90, 4.0  # ridge\n\n180 0.5\n270 -0.5\n")
+            profile = HorizonProfile.load(path, bins=4)
+            self.assertEqual(profile.elevations, (1.0, 4.0, 0.5, -0.5))
+            self.assertIs(HorizonProfile.load(path, bins=4), profile)
+            self.assertIsNot(HorizonProfile.load(path), profile)
+
+    def test_load_with_invalid_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'horizon.txt')
+            with open(path, 'w') as file:
+                file.write("0 1.0 2.0\n")
+            with self.assertRaises(ValueError):
+                HorizonProfile.load(path)
+
+    def test_empty_profile(self):
+        with self.assertRaises(ValueError):
+            HorizonProfile([])
+        with self.assertRaises(ValueError):
+            HorizonProfile.from_samples([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import math
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from dateutil import parser
+
+from test import test_helper
+from zmanim.util.geo_location import GeoLocation
+from zmanim.util.meeus_calculator import MeeusCalculator
+from zmanim.util.noaa_calculator import NOAACalculator
+
+
+class TestMeeusCalculator(unittest.TestCase):
+    def test_utc_sunrise(self):
+        calc = MeeusCalculator()
+        expected = [('2017-10-17', 41.1181036, -74.0840691, 167, 11.135686),
+                    ('2017-10-17', 34.0201613, -118.6919095, 71, 14.007347),
+                    ('1955-02-26', 31.7962994, 35.1053185, 754, 4.118629),
+                    ('2017-06-21', 70.1498248, 9.1456867, 0, None)]
+
+        def test_entry(date, lat, lng, el):
+            geo = GeoLocation('Sample', lat, lng, 'America/New_York', elevation=el)
+            result = calc.utc_sunrise(parser.parse(date), geo, 90, True)
+            return date, lat, lng, el, (None if result is None else round(result, 6))
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0], entry[1], entry[2], entry[3]), entry)
+
+    def test_utc_sunset(self):
+        calc = MeeusCalculator()
+        expected = [('2017-10-17', 41.1181036, -74.0840691, 167, 22.241121),
+                    ('1955-02-26', 31.7962994, 35.1053185, 754, 15.645145),
+                    ('2017-06-21', 70.1498248, 9.1456867, 0, None)]
+
+        def test_entry(date, lat, lng, el):
+            geo = GeoLocation('Sample', lat, lng, 'America/New_York', elevation=el)
+            result = calc.utc_sunset(parser.parse(date), geo, 90, True)
+            return date, lat, lng, el, (None if result is None else round(result, 6))
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0], entry[1], entry[2], entry[3]), entry)
+
+    def test_apparent_coordinates(self):
+        # Meeus, Astronomical Algorithms, examples 25.b and 28.b: 1992 October 13.0 TD
+        calc = MeeusCalculator()
+        tau = (2448908.5 - 2451545.0) / MeeusCalculator.JULIAN_DAYS_PER_MILLENNIUM
+        longitude, latitude, obliquity, nutation = calc._apparent_coordinates(tau)
+        self.assertAlmostEqual(longitude, 199.906061, delta=0.5 / 3600)
+        self.assertAlmostEqual(latitude, 0.000172, delta=0.05 / 3600)
+        self.assertAlmostEqual(obliquity, 23.440144, delta=0.5 / 3600)
+        self.assertAlmostEqual(calc._equation_of_time_from_coordinates(tau, longitude, latitude, obliquity, nutation), 13.71, places=2)
+
+    def test_delta_t(self):
+        expected = [(1650, 50.2), (1820, 11.9), (1910, 10.4), (1950, 29.1), (1990, 56.9), (2010, 66.7), (2100, 202.7)]
+        for year, seconds in expected:
+            self.assertAlmostEqual(MeeusCalculator.delta_t(year), seconds, places=1)
+
+    def test_terms_truncate_series(self):
+        geo = test_helper.lakewood()
+        full = MeeusCalculator()
+        truncated = MeeusCalculator(terms=8)
+        self.assertNotEqual(truncated.utc_sunrise(date(2017, 10, 17), geo, 90), full.utc_sunrise(date(2017, 10, 17), geo, 90))
+        for days in range(0, 3653, 37):
+            target_date = date(2000, 1, 1) + timedelta(days)
+            self.assertAlmostEqual(truncated.utc_sunrise(target_date, geo, 90), full.utc_sunrise(target_date, geo, 90), delta=1 / 3600)
+
+    def test_reassigning_terms_invalidates_caches(self):
+        geo = test_helper.lakewood()
+        dates = [date(2017, 10, 17), date(2018, 3, 1)]
+        calc = MeeusCalculator()
+        calc.utc_sunrise(dates[0], geo, 90)
+        calc.utc_sunrise_batch(dates, geo, 90)
+        calc.terms = 8
+        truncated = MeeusCalculator(terms=8)
+        self.assertEqual(calc.utc_sunrise(dates[0], geo, 90), truncated.utc_sunrise(dates[0], geo, 90))
+        self.assertEqual(list(calc.utc_sunrise_batch(dates, geo, 90)), list(truncated.utc_sunrise_batch(dates, geo, 90)))
+
+    def test_agrees_with_noaa(self):
+        geo = test_helper.lakewood()
+        calc = MeeusCalculator()
+        noaa = NOAACalculator()
+        for days in range(0, 3653, 37):
+            target_date = date(2000, 1, 1) + timedelta(days)
+            self.assertAlmostEqual(calc.utc_sunset(target_date, geo, 90), noaa.utc_sunset(target_date, geo, 90), delta=5 / 3600)
+
+    def test_equinoxes_and_solstices(self):
+        calc = MeeusCalculator()
+        expected = [('march_equinox', datetime(2017, 3, 20, 10, 29, tzinfo=timezone.utc)),
+                    ('june_solstice', datetime(2017, 6, 21, 4, 24, tzinfo=timezone.utc)),
+                    ('september_equinox', datetime(2017, 9, 22, 20, 2, tzinfo=timezone.utc)),
+                    ('december_solstice', datetime(2017, 12, 21, 16, 28, tzinfo=timezone.utc))]
+        for (season, instant), (expected_season, expected_instant) in zip(calc.equinoxes_and_solstices(2017), expected):
+            self.assertEqual(season, expected_season)
+            self.assertLessEqual(abs((instant - expected_instant).total_seconds()), 60)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sunset_batch(self):
+        dates = [date(1880, 1, 1) + timedelta(days) for days in range(0, 90000, 331)]
+        for calc in [MeeusCalculator(), MeeusCalculator(terms=5)]:
+            for geo in test_helper.basic_locations():
+                for target_date, result in zip(dates, calc.utc_sunset_batch(dates, geo, 96)):
+                    expected = calc.utc_sunset(target_date, geo, 96)
+                    if expected is None:
+                        self.assertTrue(math.isnan(result))
+                    else:
+                        self.assertAlmostEqual(result, expected, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,16 @@
+import math
 import unittest
+from datetime import date, datetime, timedelta
 
 from dateutil import parser
 
+from test import test_helper
+
 from zmanim.util.geo_location import GeoLocation
+from zmanim.util.horizon_profile import HorizonProfile
 from zmanim.util.noaa_calculator import NOAACalculator
+from zmanim.util.refraction import AtmosphericRefraction, ConstantRefraction, ElevationRefraction
+from zmanim.zmanim_calendar import ZmanimCalendar
 
 
 class TestNOAACalculator(unittest.TestCase):
@@ -36,6 +43,314 @@ class TestNOAACalculator(unittest.TestCase):
         for entry in expected:
             self.assertEqual(test_entry(entry[0], entry[1], entry[2], entry[3]), entry)
 
+    def test_utc_sunrise_with_refraction_model(self):
+        geo = test_helper.jerusalem()
+        expected = [(ConstantRefraction(), 3.65893934),
+                    (AtmosphericRefraction(), 3.65830547),
+                    (AtmosphericRefraction(pressure=1030, temperature=-20), 3.65186567),
+                    (ElevationRefraction(), 3.66214969)]
+
+        def test_entry(model):
+            calc = NOAACalculator()
+            calc.refraction_model = model
+            return model, round(calc.utc_sunrise(date(2017, 10, 17), geo, 90, True), 8)
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    def test_refraction_setter(self):
+        calc = NOAACalculator()
+        self.assertEqual(calc.refraction, 34 / 60.0)
+        calc.refraction = 0.5
+        self.assertIsInstance(calc.refraction_model, ConstantRefraction)
+        self.assertEqual(calc.adjusted_zenith(90, 0), 90 + 0.5 + calc.solar_radius)
+
+    def test_elevation_adjustment(self):
+        calc = NOAACalculator()
+        self.assertEqual(round(calc.elevation_adjustment(754), 8), 0.88242774)
+        self.assertEqual(calc.elevation_adjustment(754), calc.elevation_adjustment(754.0))
+        calc.earth_radius = 6378.1
+        self.assertEqual(round(calc.elevation_adjustment(754), 8), 0.88096012)
+        self.assertEqual(NOAACalculator._elevation_adjustment.cache_info().maxsize, NOAACalculator.ELEVATION_CACHE_SIZE)
+
+    def test_sun_event_type(self):
+        calc = NOAACalculator()
+        expected = [('2017-10-17', 41.1181036, -74.0840691, 90, 'event'),
+                    ('2017-06-21', 70.1498248, 9.1456867, 90, 'always_above'),
+                    ('2017-12-21', 70.1498248, 9.1456867, 90, 'always_below'),
+                    ('2017-06-21', 51.4772, 0, 108, 'always_above'),
+                    ('2017-12-21', 81.7449398, -64.7945858, 96, 'always_below')]
+
+        def test_entry(date, lat, lng, zenith):
+            geo = GeoLocation('Sample', lat, lng, 'America/New_York')
+            return date, lat, lng, zenith, calc.sun_event_type(parser.parse(date), geo, zenith).name
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0], entry[1], entry[2], entry[3]), entry)
+
+    def test_utc_sun_position_solve(self):
+        calc = NOAACalculator()
+        geo = test_helper.arctic_nunavut()
+        expected = [('fast', 11.70149120, 1),
+                    ('standard', 11.66832315, 2),
+                    ('converged', 11.66807015, 5)]
+
+        def test_entry(precision):
+            result, iterations = calc.utc_sun_position_solve(date(2017, 10, 17), geo, 96, precision=precision)
+            return precision, round(result, 8), iterations
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    def test_utc_sun_position_solve_matches_existing_passes(self):
+        calc = NOAACalculator()
+        for geo in test_helper.basic_locations():
+            for mode in ['sunrise', 'sunset']:
+                expected = calc.utc_sunrise if mode == 'sunrise' else calc.utc_sunset
+                result, iterations = calc.utc_sun_position_solve(date(2017, 10, 17), geo, 90, True, mode)
+                self.assertEqual(result, expected(date(2017, 10, 17), geo, 90, True))
+                self.assertLessEqual(iterations, 2)
+
+                converged, iterations = calc.utc_sun_position_solve(date(2017, 10, 17), geo, 90, True, mode, 'converged')
+                if converged is not None:
+                    self.assertLess(iterations, NOAACalculator.PRECISION_PASSES['converged'])
+                    self.assertAlmostEqual(converged, result, delta=1 / 60.0)
+
+    def test_utc_sun_position_solve_with_invalid_precision(self):
+        with self.assertRaises(ValueError):
+            NOAACalculator().utc_sun_position_solve(date(2017, 10, 17), test_helper.lakewood(), 90, precision='exact')
+
+    def test_utc_visible_sunrise_and_sunset(self):
+        calc = NOAACalculator()
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        geo = test_helper.jerusalem()
+        self.assertEqual(round(calc.utc_visible_sunrise(date(2017, 10, 17), geo, profile), 8), 3.99870618)
+        self.assertEqual(round(calc.utc_visible_sunset(date(2017, 10, 17), geo, profile), 8), 15.09307404)
+        self.assertIsNone(calc.utc_visible_sunrise(date(2017, 6, 21), test_helper.arctic_nunavut(), profile))
+
+        # the sun never clears a wall around the observer
+        self.assertIsNone(calc.utc_visible_sunrise(date(2017, 10, 17), geo, HorizonProfile.flat(80)))
+
+    def test_utc_visible_sunrise_with_flat_horizon(self):
+        calc = NOAACalculator()
+        for geo in test_helper.basic_locations():
+            for mode in ['sunrise', 'sunset']:
+                visible = calc.utc_visible_sunrise if mode == 'sunrise' else calc.utc_visible_sunset
+                sea_level = calc.utc_sunrise if mode == 'sunrise' else calc.utc_sunset
+                result, expected = visible(date(2017, 10, 17), geo, HorizonProfile.flat()), sea_level(date(2017, 10, 17), geo, 90)
+                if expected is None:
+                    self.assertIsNone(result)
+                else:
+                    self.assertAlmostEqual(result, expected, delta=1 / 3600.0)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_visible_sunrise_batch(self):
+        calc = NOAACalculator()
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        dates = [date(2017, 1, 1) + timedelta(days) for days in range(0, 365, 3)]
+        for geo in [test_helper.jerusalem(), test_helper.arctic_nunavut(), test_helper.samoa()]:
+            for mode in ['sunrise', 'sunset']:
+                batch = calc.utc_visible_sunrise_batch if mode == 'sunrise' else calc.utc_visible_sunset_batch
+                scalar = calc.utc_visible_sunrise if mode == 'sunrise' else calc.utc_visible_sunset
+                for target_date, result in zip(dates, batch(dates, geo, profile)):
+                    expected = scalar(target_date, geo, profile)
+                    if expected is None:
+                        self.assertTrue(math.isnan(result))
+                    else:
+                        self.assertAlmostEqual(result, expected, places=10)
+
+    def test_equinoxes_and_solstices(self):
+        calc = NOAACalculator()
+        expected = [('march_equinox', '2017-03-20T10:22:22+00:00'),
+                    ('june_solstice', '2017-06-21T04:16:19+00:00'),
+                    ('september_equinox', '2017-09-22T20:01:14+00:00'),
+                    ('december_solstice', '2017-12-21T16:31:55+00:00')]
+        results = [(season, instant.replace(microsecond=0).isoformat()) for season, instant in calc.equinoxes_and_solstices(2017)]
+        self.assertEqual(results, expected)
+
+        # published instants, within the precision of the NOAA series
+        published = ['2017-03-20T10:29Z', '2017-06-21T04:24Z', '2017-09-22T20:02Z', '2017-12-21T16:28Z']
+        for (_, instant), reference in zip(calc.equinoxes_and_solstices(2017), published):
+            self.assertLess(abs((instant - parser.parse(reference)).total_seconds()), 600)
+
+    def test_equinoxes_and_solstices_for_range_of_years(self):
+        calc = NOAACalculator()
+        results = calc.equinoxes_and_solstices(1950, 2049)
+        self.assertEqual(len(results), 400)
+        self.assertEqual([season for season, _ in results[:4]], list(NOAACalculator.SEASONS))
+        for (season, instant), (_, following) in zip(results, results[1:]):
+            self.assertAlmostEqual((following - instant).days, 91, delta=3)
+        for season, instant in results:
+            julian_centuries = calc._julian_centuries_from_julian_day(calc.julian_day(instant.replace(tzinfo=None)))
+            declination = calc._solar_declination(julian_centuries)
+            if season.endswith('equinox'):
+                self.assertAlmostEqual(declination, 0, places=6)
+            else:
+                self.assertAlmostEqual(abs(declination), calc._obliquity_correction(julian_centuries), places=6)
+
+    def test_solar_position(self):
+        calc = NOAACalculator()
+        expected = [('2017-10-17T16:42:19Z', 40.4346, 180.0336),
+                    ('2017-10-17T11:09:52Z', -0.8322, 101.6213),
+                    ('2017-10-17T22:13:59Z', -0.8334, 258.1586),
+                    ('2017-10-17T06:00:00-04:00', -14.0934, 90.4959)]
+
+        def test_entry(instant):
+            elevation, azimuth = calc.solar_position(parser.parse(instant), test_helper.lakewood())
+            return instant, round(elevation, 4), round(azimuth, 4)
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_solar_position_batch(self):
+        import numpy as np
+
+        calc = NOAACalculator()
+        instants = [parser.parse('2017-01-01T00:00:00Z') + timedelta(minutes=minutes) for minutes in range(0, 525600, 337)]
+        for geo in [test_helper.lakewood(), test_helper.samoa(), test_helper.arctic_nunavut()]:
+            elevations, azimuths = calc.solar_position_batch(instants, geo)
+            for instant, elevation, azimuth in zip(instants, elevations, azimuths):
+                expected_elevation, expected_azimuth = calc.solar_position(instant, geo)
+                self.assertAlmostEqual(elevation, expected_elevation, places=8)
+                self.assertAlmostEqual(azimuth, expected_azimuth, places=8)
+
+        datetimes = np.array(['2017-10-17T16:42:19', '2017-10-17T11:09:52'], dtype='datetime64[s]')
+        elevations, azimuths = calc.solar_position_batch(datetimes, test_helper.lakewood())
+        self.assertEqual([round(elevation, 4) for elevation in elevations], [40.4346, -0.8322])
+
+    def test_utc_sun_position_steps(self):
+        calc = NOAACalculator()
+        start, end = date(2017, 1, 1), date(2017, 12, 31)
+        for geo in [test_helper.lakewood(), test_helper.arctic_nunavut(), test_helper.samoa()]:
+            for zenith, mode in [(90.833, 'sunrise'), (90.833, 'sunset'), (108, 'sunrise')]:
+                steps = list(calc.utc_sun_position_steps(start, end, geo, zenith, mode=mode))
+                self.assertEqual([target_date for target_date, _ in steps], [start + timedelta(days) for days in range(365)])
+                for target_date, utc_time in steps:
+                    expected = calc.utc_sunrise(target_date, geo, zenith) if mode == 'sunrise' else calc.utc_sunset(target_date, geo, zenith)
+                    if expected is None:
+                        self.assertIsNone(utc_time)
+                    else:
+                        self.assertLessEqual(abs(utc_time - expected) * 3600, NOAACalculator.STEP_TOLERANCE)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_sun_event_type_batch(self):
+        calc = NOAACalculator()
+        geo = test_helper.arctic_nunavut()
+        dates = [date(2017, 1, 1) + timedelta(days) for days in range(365)]
+        for mode in ['sunrise', 'sunset']:
+            types = calc.sun_event_type_batch(dates, geo, 90, True, mode)
+            times = calc.utc_sunrise_batch(dates, geo, 90, True) if mode == 'sunrise' else calc.utc_sunset_batch(dates, geo, 90, True)
+            for target_date, event_type, utc_time in zip(dates, types, times):
+                self.assertEqual(event_type, calc.sun_event_type(target_date, geo, 90, True, mode).value)
+                self.assertEqual(event_type == NOAACalculator.SUN_EVENTS.event.value, not math.isnan(utc_time))
+
+    def test_julian_day(self):
+        def reference_julian_day(dt):
+            a = math.floor((14 - dt.month) / 12)
+            y = dt.year + 4800 - a
+            m = dt.month + 12 * a - 3
+            jdn = dt.day + math.floor((153 * m + 2) / 5) + 365 * y + math.floor(y / 4) - math.floor(y / 100) + \
+                math.floor(y / 400) - 32045
+            return jdn + (dt.hour - 12) / 24 + dt.minute / 1440 + dt.second / 86400 + dt.microsecond / 86400000000
+
+        for days in range(0, date.max.toordinal() - 1, 97):
+            target_date = date.min + timedelta(days)
+            self.assertEqual(NOAACalculator.julian_day(target_date), reference_julian_day(datetime.combine(target_date, datetime.min.time())))
+            target_time = datetime.combine(target_date, datetime.min.time()) + timedelta(seconds=days * 7919.123457 % 86400)
+            self.assertEqual(NOAACalculator.julian_day(target_time), reference_julian_day(target_time))
+
+    def test_utc_sun_positions(self):
+        calc = NOAACalculator()
+        zeniths = [90, 96.1, 98.5, 106.1, 108, 110]
+        for geo in test_helper.basic_locations() + [test_helper.hooper_bay(), test_helper.daneborg()]:
+            for target_date in [date(2017, 10, 17), date(2017, 6, 21), date(2017, 12, 21)]:
+                results = calc.utc_sun_positions(target_date, geo, zeniths, True)
+                for zenith in zeniths:
+                    self.assertEqual(results[(zenith, 'sunrise')], calc.utc_sunrise(target_date, geo, zenith, True))
+                    self.assertEqual(results[(zenith, 'sunset')], calc.utc_sunset(target_date, geo, zenith, True))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sunrise_batch(self):
+        calc = NOAACalculator()
+        dates = [date(2017, 10, 17), date(1955, 2, 26), date(2017, 6, 21)]
+        geo = GeoLocation('Sample', 70.1498248, 9.1456867, 'America/New_York')
+        result = calc.utc_sunrise_batch(dates, geo, 90, True)
+        for batch, target_date in zip(result[:2], dates[:2]):
+            # numpy's vectorized trigonometry can differ from the math module in the last bit
+            self.assertAlmostEqual(batch, calc.utc_sunrise(target_date, geo, 90, True), delta=1e-12)
+        self.assertTrue(math.isnan(result[2]))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_batch_matches_scalar(self):
+        calc = NOAACalculator()
+        dates = [date(1900, 1, 1) + timedelta(days) for days in range(0, 73000, 97)]
+        for geo in test_helper.basic_locations():
+            for zenith in [90, 96.1, 106.1]:
+                sunrises = calc.utc_sunrise_batch(dates, geo, zenith, True)
+                sunsets = calc.utc_sunset_batch(dates, geo, zenith, True)
+                for target_date, sunrise, sunset in zip(dates, sunrises, sunsets):
+                    for batch, scalar in [(sunrise, calc.utc_sunrise(target_date, geo, zenith, True)),
+                                          (sunset, calc.utc_sunset(target_date, geo, zenith, True))]:
+                        if scalar is None:
+                            self.assertTrue(math.isnan(batch))
+                        else:
+                            # numpy's vectorized trigonometry can differ from the math module in the last bit
+                            self.assertAlmostEqual(batch, scalar, delta=1e-12)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sunset_grid(self):
+        calc = NOAACalculator()
+        latitudes = [-41.1181036, 31.7962994, 70.1498248, 81.7449398]
+        longitudes = [-74.0840691, 9.1456867, 35.1053185]
+        result = calc.utc_sunset_grid(date(2017, 6, 21), latitudes, longitudes, 90)
+        self.assertEqual(result.shape, (4, 3))
+        for row, lat in enumerate(latitudes):
+            for column, lng in enumerate(longitudes):
+                expected = calc.utc_sunset(date(2017, 6, 21), GeoLocation('Sample', lat, lng, 'UTC'), 90)
+                if expected is None:
+                    self.assertTrue(result.mask[row, column])
+                else:
+                    self.assertAlmostEqual(result[row, column], expected, places=12)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sunrise_grid_with_meshgrid(self):
+        import numpy
+
+        calc = NOAACalculator()
+        latitudes, longitudes = numpy.linspace(-60, 85, 30), numpy.linspace(-180, 180, 40)
+        vectors = calc.utc_sunrise_grid(date(2017, 12, 21), latitudes, longitudes, 96, elevation=100)
+        mesh = calc.utc_sunrise_grid(date(2017, 12, 21), *numpy.meshgrid(latitudes, longitudes, indexing='ij'), 96, elevation=100)
+        self.assertTrue(numpy.ma.allequal(vectors, mesh))
+        self.assertTrue(numpy.array_equal(vectors.mask, mesh.mask))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_candle_lighting_grid(self):
+        calc = NOAACalculator()
+        latitudes = [-41.1181036, 31.7962994, 70.1498248, 81.7449398]
+        longitudes = [-74.0840691, 9.1456867, 35.1053185]
+        result = calc.utc_candle_lighting_grid(date(2017, 6, 23), latitudes, longitudes, 40)
+        self.assertEqual(result.shape, (4, 3))
+        for row, lat in enumerate(latitudes):
+            for column, lng in enumerate(longitudes):
+                # elevation does not affect candle lighting, which is based on sea level sunset
+                geo = GeoLocation('Sample', lat, lng, 'UTC', elevation=500)
+                candle_lighting = ZmanimCalendar(40, geo_location=geo, date=date(2017, 6, 23), output_mode='timestamp').candle_lighting()
+                if candle_lighting is None:
+                    self.assertTrue(result.mask[row, column])
+                else:
+                    expected = (candle_lighting % 86400) / 3600.0
+                    self.assertAlmostEqual(result[row, column], expected, delta=1e-9)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_solar_noon_and_midnight_batch(self):
+        calc = NOAACalculator()
+        dates = [date(2017, 1, 1) + timedelta(days) for days in range(0, 365, 11)]
+        for geo in test_helper.basic_locations() + [test_helper.samoa()]:
+            for target_date, noon, midnight in zip(dates, calc.utc_solar_noon_batch(dates, geo), calc.utc_solar_midnight_batch(dates, geo)):
+                self.assertAlmostEqual(noon, calc.utc_solar_noon(target_date, geo), delta=1e-12)
+                self.assertAlmostEqual(midnight, calc.utc_solar_midnight(target_date, geo), delta=1e-12)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import math
+import unittest
+
+from test import test_helper
+from zmanim.util.refraction import AtmosphericRefraction, ConstantRefraction, ElevationRefraction
+
+
+class TestRefraction(unittest.TestCase):
+    def test_constant_refraction(self):
+        model = ConstantRefraction()
+        self.assertEqual([model.refraction(altitude) for altitude in [-1, 0, 45]], [34 / 60.0] * 3)
+        self.assertEqual(model.horizon_refraction(1000), 34 / 60.0)
+        self.assertEqual(ConstantRefraction(0.5).horizon_refraction(), 0.5)
+
+    def test_atmospheric_refraction(self):
+        model = AtmosphericRefraction()
+        expected = [(-0.5, 33.6935), (0, 28.9332), (1, 21.7604), (5, 9.6354), (10, 5.3467), (45, 0.9943), (90, 0.0)]
+
+        def test_entry(altitude):
+            return altitude, round(model.refraction(altitude) * 60, 4)
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0]), entry)
+        self.assertEqual(round(model.horizon_refraction() * 60, 4), 34.4775)
+
+    def test_refraction_table_matches_formula(self):
+        model = AtmosphericRefraction(pressure=1030.0, temperature=-10.0)
+        for step in range(0, 1000):
+            true_altitude = -1.5 + (step * 0.0917)
+            apparent_altitude = true_altitude
+            for _ in range(50):
+                apparent_altitude = true_altitude + model.apparent_refraction(apparent_altitude)
+            self.assertAlmostEqual(model.refraction(true_altitude), apparent_altitude - true_altitude, delta=0.2 / 3600)
+
+    def test_conditions_scale_refraction(self):
+        standard, cold = AtmosphericRefraction(), AtmosphericRefraction(pressure=1030.0, temperature=-20.0)
+        self.assertAlmostEqual(cold.horizon_refraction() / standard.horizon_refraction(), (1030.0 / 1010.0) * (283.0 / 253.0))
+
+    def test_elevation_refraction(self):
+        model = ElevationRefraction()
+        self.assertEqual(model.refraction(2.0), AtmosphericRefraction().refraction(2.0))
+        self.assertAlmostEqual(model.refraction(2.0, 1000) / model.refraction(2.0), math.exp(-1000 / ElevationRefraction.SCALE_HEIGHT))
+
+    def test_compiled_tables_are_shared(self):
+        self.assertIs(AtmosphericRefraction(1000.0, 5.0)._table, AtmosphericRefraction(1000.0, 5.0)._table)
+        self.assertIsNot(AtmosphericRefraction(1000.0, 5.0)._table, AtmosphericRefraction(1000.0, 6.0)._table)
+        self.assertEqual(AtmosphericRefraction(1000.0, 5.0), AtmosphericRefraction(1000.0, 5.0))
+        self.assertNotEqual(AtmosphericRefraction(1000.0, 5.0), ElevationRefraction(1000.0, 5.0))
+
+    def test_constant_refraction_is_not_tabulated(self):
+        self.assertIsNone(ConstantRefraction()._table)
+
+    def test_caches_are_bounded(self):
+        model, sea_level = ElevationRefraction(), AtmosphericRefraction().refraction(2.0)
+        for elevation in range(ElevationRefraction.PRESSURE_FACTOR_CACHE_SIZE + 10):
+            self.assertAlmostEqual(model.refraction(2.0, elevation), sea_level * math.exp(-elevation / ElevationRefraction.SCALE_HEIGHT))
+        self.assertEqual(len(model._pressure_factors), ElevationRefraction.PRESSURE_FACTOR_CACHE_SIZE)
+        self.assertEqual(next(iter(model._pressure_factors)), 10)  # the least recently used are evicted first
+        self.assertEqual(ElevationRefraction._shared_table.cache_info().maxsize, ElevationRefraction.TABLE_CACHE_SIZE)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_refraction_array(self):
+        import numpy as np
+
+        model = ElevationRefraction()
+        altitudes = np.linspace(-3, 91, 777)
+        self.assertEqual([round(refraction, 12) for refraction in model.refraction_array(altitudes, 500)],
+                         [round(model.refraction(altitude, 500), 12) for altitude in altitudes])
+        self.assertEqual(list(ConstantRefraction(0.5).refraction_array(altitudes, 500)), [0.5] * len(altitudes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
+import math
 import unittest
+from datetime import date, timedelta
 
 from dateutil import parser
 
+from test import test_helper
+
 from zmanim.util.geo_location import GeoLocation
+from zmanim.util.horizon_profile import HorizonProfile
 from zmanim.util.sun_times_calculator import SunTimesCalculator
 
 
@@ -35,6 +40,100 @@ class TestSunTimesCalculator(unittest.TestCase):
         for entry in expected:
             self.assertEqual(test_entry(entry[0], entry[1], entry[2], entry[3]), entry)
 
+    def test_sun_event_type(self):
+        calc = SunTimesCalculator()
+        expected = [('2017-10-17', 41.1181036, -74.0840691, 90, 'event'),
+                    ('2017-06-21', 70.1498248, 9.1456867, 90, 'always_above'),
+                    ('2017-12-21', 70.1498248, 9.1456867, 90, 'always_below')]
+
+        def test_entry(date, lat, lng, zenith):
+            geo = GeoLocation('Sample', lat, lng, 'America/New_York')
+            return date, lat, lng, zenith, calc.sun_event_type(parser.parse(date), geo, zenith).name
+
+        for entry in expected:
+            self.assertEqual(test_entry(entry[0], entry[1], entry[2], entry[3]), entry)
+
+    def test_utc_sun_positions(self):
+        calc = SunTimesCalculator()
+        geo = test_helper.lakewood()
+        results = calc.utc_sun_positions(date(2017, 10, 17), geo, [90, 106.1], modes=['sunset'])
+        self.assertEqual(results, {(90, 'sunset'): calc.utc_sunset(date(2017, 10, 17), geo, 90),
+                                   (106.1, 'sunset'): calc.utc_sunset(date(2017, 10, 17), geo, 106.1)})
+
+    def test_utc_sun_position_solve(self):
+        calc = SunTimesCalculator()
+        geo = test_helper.lakewood()
+        for precision in SunTimesCalculator.PRECISIONS:
+            self.assertEqual(calc.utc_sun_position_solve(date(2017, 10, 17), geo, 96, precision=precision),
+                             (calc.utc_sunrise(date(2017, 10, 17), geo, 96), 1))
+
+    def test_utc_visible_sunrise_and_sunset(self):
+        calc = SunTimesCalculator()
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        geo = test_helper.jerusalem()
+        self.assertEqual(round(calc.utc_visible_sunrise(date(2017, 10, 17), geo, profile), 8), 3.99394855)
+        self.assertEqual(round(calc.utc_visible_sunset(date(2017, 10, 17), geo, profile), 8), 15.10362223)
+        self.assertIsNone(calc.utc_visible_sunrise(date(2017, 6, 21), test_helper.arctic_nunavut(), profile))
+
+        # the sun never clears a wall around the observer
+        self.assertIsNone(calc.utc_visible_sunrise(date(2017, 10, 17), geo, HorizonProfile.flat(80)))
+
+    def test_utc_visible_sunrise_with_flat_horizon(self):
+        calc = SunTimesCalculator()
+        for geo in test_helper.basic_locations() + [test_helper.samoa()]:
+            for mode in ['sunrise', 'sunset']:
+                visible = calc.utc_visible_sunrise if mode == 'sunrise' else calc.utc_visible_sunset
+                sea_level = calc.utc_sunrise if mode == 'sunrise' else calc.utc_sunset
+                result, expected = visible(date(2017, 10, 17), geo, HorizonProfile.flat()), sea_level(date(2017, 10, 17), geo, 90)
+                if expected is None:
+                    self.assertIsNone(result)
+                else:
+                    # within the scan's resolution, as the almanac's events and positions are separate approximations
+                    self.assertAlmostEqual(result, expected, delta=2 / 3600.0)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_visible_sunrise_batch(self):
+        calc = SunTimesCalculator()
+        profile = HorizonProfile.from_samples([(0, 1), (90, 4), (120, 2.5), (180, 0.5), (270, -0.3)])
+        dates = [date(2017, 1, 1) + timedelta(days) for days in range(0, 365, 9)]
+        for geo in [test_helper.jerusalem(), test_helper.arctic_nunavut(), test_helper.samoa()]:
+            for mode in ['sunrise', 'sunset']:
+                batch = calc.utc_visible_sunrise_batch if mode == 'sunrise' else calc.utc_visible_sunset_batch
+                scalar = calc.utc_visible_sunrise if mode == 'sunrise' else calc.utc_visible_sunset
+                for target_date, result in zip(dates, batch(dates, geo, profile)):
+                    expected = scalar(target_date, geo, profile)
+                    if expected is None:
+                        self.assertTrue(math.isnan(result))
+                    else:
+                        self.assertEqual(result, expected)
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_sun_position_batch_parity(self):
+        calc = SunTimesCalculator()
+        dates = [date(2024, 1, 1) + timedelta(days) for days in range(366)]
+        locations = test_helper.basic_locations() + [test_helper.hooper_bay(), test_helper.daneborg()]
+        for geo in locations:
+            for zenith in [90, 96, 108]:
+                for mode in ['sunrise', 'sunset']:
+                    batch = calc.utc_sunrise_batch if mode == 'sunrise' else calc.utc_sunset_batch
+                    adjusted_zenith = calc.adjusted_zenith(zenith, geo.elevation)
+                    for target_date, result in zip(dates, batch(dates, geo, zenith, True)):
+                        expected = calc._calculate_utc_sun_position(target_date, geo.latitude, geo.longitude, adjusted_zenith, mode)
+                        if expected is None:
+                            self.assertTrue(math.isnan(result), (geo, zenith, mode, target_date))
+                        else:
+                            # numpy's vectorized trigonometry can differ from the math module in the last bit
+                            self.assertAlmostEqual(result, expected % 24, delta=1e-12, msg=(geo, zenith, mode, target_date))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_utc_solar_noon_and_midnight_batch(self):
+        calc = SunTimesCalculator()
+        dates = [date(2017, 1, 1) + timedelta(days) for days in range(0, 365, 11)]
+        for geo in test_helper.basic_locations() + [test_helper.samoa()]:
+            for target_date, noon, midnight in zip(dates, calc.utc_solar_noon_batch(dates, geo), calc.utc_solar_midnight_batch(dates, geo)):
+                self.assertAlmostEqual(noon, calc.utc_solar_noon(target_date, geo), delta=1e-12)
+                self.assertAlmostEqual(midnight, calc.utc_solar_midnight(target_date, geo), delta=1e-12)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
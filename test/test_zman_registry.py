@@ -0,0 +1,109 @@
+import unittest
+from datetime import date, timedelta
+
+from test import test_helper
+from zmanim.util.noaa_calculator import NOAACalculator
+from zmanim.zman_registry import ZmanRegistry, ZmanSpec
+from zmanim.zmanim_calendar import ZmanimCalendar
+
+
+class CountingCalculator(NOAACalculator):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def utc_sun_positions(self, *args, **kwargs):
+        self.calls += 1
+        return super().utc_sun_positions(*args, **kwargs)
+
+
+class TestZmanRegistry(unittest.TestCase):
+    def test_standard_zmanim_match_calendar_methods(self):
+        names = ZmanRegistry.default().names()
+        for geo in test_helper.basic_locations() + [test_helper.hooper_bay()]:
+            for days in range(0, 365, 23):
+                for use_elevation in [False, True]:
+                    calendar = ZmanimCalendar(geo_location=geo, date=date(2017, 1, 1) + timedelta(days))
+                    calendar.use_elevation = use_elevation
+                    results = calendar.zmanim(names)
+                    calendar.clear_cache()
+                    for name in names:
+                        self.assertEqual(results[name], getattr(calendar, name)(), name)
+
+    def test_specs_from_opts_match_calendar_methods(self):
+        registry = ZmanRegistry.standard()
+        opts = [{'degrees': 19.8}, {'offset': 60}, {'zmanis_offset': 90}, {'degrees': 16.1, 'offset': 0}]
+        for index, opt in enumerate(opts):
+            registry.register('alos_%d' % index, ZmanSpec.from_opts('sunrise', opt))
+            registry.register('tzais_%d' % index, ZmanSpec.from_opts('sunset', opt))
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        results = calendar.zmanim(['alos_%d' % index for index in range(len(opts))] + ['tzais_%d' % index for index in range(len(opts))], registry)
+        for index, opt in enumerate(opts):
+            self.assertEqual(results['alos_%d' % index], calendar.alos(opt))
+            self.assertEqual(results['tzais_%d' % index], calendar.tzais(opt))
+
+    def test_shared_events_are_solved_once(self):
+        registry = ZmanRegistry.standard()
+        for degrees in [11.5, 16.1, 18, 19.8]:
+            registry.register('alos_%s' % degrees, ZmanSpec('sunrise', degrees=degrees))
+        for minutes in range(20, 120, 2):
+            registry.register('tzais_%s' % minutes, ZmanSpec('sunset', offset=minutes))
+        names = registry.names()
+        plan = registry.compile(names)
+        self.assertEqual(sorted(plan.zeniths[('sunrise', False)]), [101.5, 106.1, 108, 109.8])
+        self.assertEqual(len([step for step in plan.steps if step[0][0] == 'event']), 9)
+        self.assertIs(registry.compile(names), plan)
+
+        calculator = CountingCalculator()
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17), calculator=calculator)
+        results = calendar.zmanim(names, registry)
+        self.assertEqual(len(results), len(names))
+        self.assertEqual(calculator.calls, 2)  # one pass each for sunrise and sunset
+        calendar.clear_cache()
+        calendar.use_elevation = True
+        calendar.zmanim(names, registry)
+        self.assertEqual(calculator.calls, 6)  # elevation adjusted and sea level zeniths are solved separately
+
+    def test_shaah_zmanis_specs(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        results = calendar.zmanim(['shaah_zmanis_gra', 'shaah_zmanis_mga'])
+        self.assertEqual(results['shaah_zmanis_gra'], calendar.shaah_zmanis_gra())
+        self.assertEqual(results['shaah_zmanis_mga'], calendar.shaah_zmanis_mga())
+
+    def test_candle_lighting_follows_calendar_offset(self):
+        calendar = ZmanimCalendar(candle_lighting_offset=40, geo_location=test_helper.jerusalem(), date=date(2017, 10, 20))
+        self.assertEqual(calendar.zmanim(['candle_lighting'])['candle_lighting'], calendar.candle_lighting())
+
+    def test_timestamp_output_mode(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17), output_mode='timestamp')
+        names = ZmanRegistry.default().names()
+        results = calendar.zmanim(names)
+        for name in names:
+            self.assertEqual(results[name], getattr(calendar, name)())
+
+    def test_unknown_and_circular_zmanim(self):
+        registry = ZmanRegistry.standard()
+        with self.assertRaises(ValueError):
+            registry.compile(['misheyakir'])
+        registry.register('first', ZmanSpec(day_start='second', day_end='shkia', shaos=1))
+        registry.register('second', ZmanSpec(day_start='first', day_end='shkia', shaos=1))
+        with self.assertRaises(ValueError):
+            registry.compile(['first'])
+
+    def test_invalid_specs(self):
+        with self.assertRaises(ValueError):
+            ZmanSpec()
+        with self.assertRaises(ValueError):
+            ZmanSpec('sunrise', day_start='hanetz', day_end='shkia')
+        with self.assertRaises(ValueError):
+            ZmanSpec('twilight')
+        with self.assertRaises(ValueError):
+            ZmanSpec('noon', degrees=6)
+        with self.assertRaises(ValueError):
+            ZmanSpec('sunset', offset=72, zmanis_offset=72)
+        with self.assertRaises(ValueError):
+            ZmanSpec(day_start='hanetz', day_end='shkia', offset=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
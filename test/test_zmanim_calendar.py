@@ -1,4 +1,5 @@
 import unittest
+from array import array
 from datetime import date, timedelta
 
 from dateutil import parser
@@ -16,6 +17,13 @@ class TestZmanimCalendar(unittest.TestCase):
         calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
         self.assertEqual(calendar.shkia(), calendar.sea_level_sunset())
 
+    def test_candle_lighting_annual_extremes(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        earliest, latest = calendar.annual_extremes('candle_lighting')
+        self.assertEqual(earliest.replace(microsecond=0).isoformat(), "2017-12-07T16:13:19-05:00")
+        self.assertEqual(latest.replace(microsecond=0).isoformat(), "2017-06-27T20:12:08-04:00")
+        self.assertEqual(calendar.date, date(2017, 10, 17))
+
     def test_tzais(self):
         calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
         self.assertEqual(calendar.tzais().replace(microsecond=0).isoformat(), "2017-10-17T18:54:29-04:00")
@@ -58,7 +66,7 @@ class TestZmanimCalendar(unittest.TestCase):
 
     def test_chatzos(self):
         calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
-        self.assertEqual(calendar.chatzos().replace(microsecond=0).isoformat(), "2017-10-17T12:41:55-04:00")
+        self.assertEqual(calendar.chatzos().replace(microsecond=0).isoformat(), "2017-10-17T12:42:18-04:00")
 
     def test_sof_zman_shma(self):
         calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
@@ -193,7 +201,7 @@ class TestZmanimCalendar(unittest.TestCase):
     def test_chatzos_using_elevation(self):
         calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
         calendar.use_elevation = True
-        self.assertEqual(calendar.chatzos().replace(microsecond=0).isoformat(), "2017-10-17T12:41:55-04:00")
+        self.assertEqual(calendar.chatzos().replace(microsecond=0).isoformat(), "2017-10-17T12:42:18-04:00")
 
     def test_sof_zman_shma_using_elevation(self):
         calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
@@ -335,6 +343,143 @@ class TestZmanimCalendar(unittest.TestCase):
         self.assertTrue(calendar.is_assur_bemelacha(calendar.tzais() - timedelta(seconds=2), in_israel=True))
         self.assertTrue(calendar.is_assur_bemelacha(calendar.tzais() + timedelta(seconds=2), in_israel=True))
 
+    def test_assur_bemelacha_in_timestamp_mode_with_custom_tzais_time(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 21), output_mode='timestamp')
+        tzais = calendar.date_time_from_timestamp(calendar.tzais_72())
+        for custom_tzais in [tzais, tzais.timestamp()]:
+            self.assertTrue(calendar.is_assur_bemelacha(tzais - timedelta(seconds=2), custom_tzais))
+            self.assertFalse(calendar.is_assur_bemelacha(tzais + timedelta(seconds=2), custom_tzais))
+
+    def test_assur_bemelacha_in_timestamp_mode_with_timestamp_current_time(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 21), output_mode='timestamp')
+        tzais = calendar.tzais()
+        self.assertTrue(calendar.is_assur_bemelacha(tzais - 2))
+        self.assertFalse(calendar.is_assur_bemelacha(tzais + 2))
+        self.assertTrue(calendar.is_assur_bemelacha(tzais - 2, tzais))
+        self.assertFalse(calendar.is_assur_bemelacha(tzais + 2, calendar.date_time_from_timestamp(tzais)))
+
+        friday = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 20), output_mode='timestamp')
+        self.assertFalse(friday.is_assur_bemelacha(friday.shkia() - 2))
+        self.assertTrue(friday.is_assur_bemelacha(friday.tzais() + 2))
+
+    def test_timestamp_output_mode(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        timestamps = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17), output_mode='timestamp')
+        for zman in ['hanetz', 'tzais', 'tzais_72', 'alos', 'chatzos', 'candle_lighting', 'sof_zman_shma_gra', 'sof_zman_shma_mga',
+                     'sof_zman_tfila_mga', 'mincha_gedola', 'mincha_ketana', 'plag_hamincha']:
+            self.assertAlmostEqual(getattr(timestamps, zman)(), getattr(calendar, zman)().timestamp(), delta=2e-6)
+        self.assertAlmostEqual(timestamps.tzais({'zmanis_offset': 90}), calendar.tzais({'zmanis_offset': 90}).timestamp(), delta=2e-6)
+        self.assertAlmostEqual(timestamps.shaah_zmanis_mga(), calendar.shaah_zmanis_mga(), delta=1e-3)
+        self.assertEqual(timestamps.date_time_from_timestamp(timestamps.tzais()).replace(microsecond=0).isoformat(), "2017-10-17T18:54:29-04:00")
+
+    def test_timestamp_output_mode_annual_extremes(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17), output_mode='timestamp')
+        earliest, latest = calendar.annual_extremes('candle_lighting')
+        self.assertEqual(calendar.date_time_from_timestamp(earliest).replace(microsecond=0).isoformat(), "2017-12-07T16:13:19-05:00")
+        self.assertEqual(calendar.date_time_from_timestamp(latest).replace(microsecond=0).isoformat(), "2017-06-27T20:12:08-04:00")
+
+    def test_assur_bemelacha_in_timestamp_output_mode(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=parser.parse('2017-10-20'), output_mode='timestamp')
+        tzais = calendar.date_time_from_timestamp(calendar.tzais())
+        self.assertTrue(calendar.is_assur_bemelacha(tzais - timedelta(seconds=2)))
+        self.assertFalse(calendar.is_assur_bemelacha(calendar.date_time_from_timestamp(calendar.shkia()) - timedelta(seconds=2)))
+
+    def test_all_zmanim(self):
+        for geo in test_helper.basic_locations() + [test_helper.hooper_bay()]:
+            for days in range(0, 365, 29):
+                calendar = ZmanimCalendar(geo_location=geo, date=date(2017, 1, 1) + timedelta(days))
+                result = calendar.all_zmanim()
+                calendar.clear_cache()
+                self.assertEqual(result.date, calendar.date)
+                for name, value in result:
+                    self.assertEqual(value, getattr(calendar, name)(), name)
+
+    def test_all_zmanim_result(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        result = calendar.all_zmanim()
+        self.assertEqual(result.tzais.replace(microsecond=0).isoformat(), "2017-10-17T18:54:29-04:00")
+        self.assertEqual(result.sof_zman_shma_mga, calendar.sof_zman_shma_mga())
+        self.assertEqual(list(result.as_dict()), list(result.ZMANIM))
+        self.assertEqual(result, calendar.all_zmanim())
+        with self.assertRaises(AttributeError):
+            result.misheyakir = calendar.alos()
+
+    def test_zmanim_rows(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        rows = calendar.zmanim_rows(date(2017, 12, 30), date(2018, 1, 2), ['hanetz', 'plag_hamincha', 'tzais'])
+        self.assertEqual(next(rows)[0], date(2017, 12, 30))
+        rows = list(rows)
+        self.assertEqual([row[0] for row in rows], [date(2017, 12, 31), date(2018, 1, 1), date(2018, 1, 2)])
+        for row_date, hanetz, plag_hamincha, tzais in rows:
+            expected = ZmanimCalendar(geo_location=test_helper.lakewood(), date=row_date)
+            self.assertEqual((hanetz, plag_hamincha, tzais), (expected.hanetz(), expected.plag_hamincha(), expected.tzais()))
+        self.assertEqual(calendar.date, date(2017, 10, 17))
+        self.assertEqual(list(calendar.zmanim_rows(date(2018, 1, 2), date(2018, 1, 1), ['hanetz'])), [])
+
+    def test_zmanim_rows_for_locations(self):
+        calendar = ZmanimCalendar(output_mode='timestamp')
+        locations = [test_helper.lakewood(), test_helper.jerusalem()]
+        rows = list(calendar.zmanim_rows(date(2017, 10, 17), date(2017, 10, 18), ['shkia'], locations=locations))
+        self.assertEqual([(row[0].location_name, row[1]) for row in rows],
+                         [(location.location_name, target_date) for location in locations for target_date in [date(2017, 10, 17), date(2017, 10, 18)]])
+        for location, row_date, shkia in rows:
+            expected = ZmanimCalendar(geo_location=location, date=row_date, output_mode='timestamp')
+            self.assertEqual(shkia, expected.shkia())
+
+    def test_zmanim_chunks(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood())
+        names = ['alos', 'sof_zman_shma_gra', 'chatzos']
+        chunks = list(calendar.zmanim_chunks(date(2017, 1, 1), date(2017, 12, 31), names, chunk_size=100))
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 100, 65])
+        self.assertEqual([row for chunk in chunks for row in chunk], list(calendar.zmanim_rows(date(2017, 1, 1), date(2017, 12, 31), names)))
+        with self.assertRaises(ValueError):
+            next(calendar.zmanim_chunks(date(2017, 1, 1), date(2017, 12, 31), names, chunk_size=0))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_zmanim_columns(self):
+        names = ['alos', 'hanetz', 'sof_zman_shma_mga', 'chatzos', 'plag_hamincha', 'candle_lighting', 'tzais', 'shaah_zmanis_gra']
+        dates = [date(2017, 1, 1) + timedelta(days) for days in range(0, 365, 7)]
+        for geo in test_helper.basic_locations() + [test_helper.samoa(), test_helper.arctic_nunavut()]:
+            calendar = ZmanimCalendar(geo_location=geo, output_mode='timestamp')
+            out, mask = calendar.zmanim_columns(dates, names)
+            self.assertEqual(out.shape, (len(names), len(dates)))
+            for column, target_date in enumerate(dates):
+                calendar.date = target_date
+                for row, name in enumerate(names):
+                    expected = getattr(calendar, name)()
+                    if expected is None:
+                        self.assertFalse(mask[row, column], (geo, name, target_date))
+                    else:
+                        self.assertTrue(mask[row, column], (geo, name, target_date))
+                        self.assertAlmostEqual(out[row, column], expected, delta=1e-5, msg=(geo, name, target_date))
+
+    @unittest.skipUnless(test_helper.numpy_available(), 'numpy is not installed')
+    def test_zmanim_columns_into_buffers(self):
+        import numpy as np
+
+        dates = [date(2017, 10, 17), date(2017, 10, 18)]
+        calendar = ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17))
+        out = [array('d', [0.0] * 2), np.zeros(2)]
+        mask = [memoryview(bytearray(2)).cast('?'), np.zeros(2, dtype=bool)]
+        self.assertIs(calendar.zmanim_columns(dates, ['hanetz', 'tzais'], out=out, mask=mask)[0], out)
+        self.assertAlmostEqual(out[0][0], calendar.hanetz().timestamp(), delta=1e-5)
+        self.assertAlmostEqual(out[1][0], calendar.tzais().timestamp(), delta=1e-5)
+        self.assertEqual(list(mask[0]), [True, True])
+        self.assertTrue(mask[1].all())
+
+        with self.assertRaises(ValueError):
+            calendar.zmanim_columns(dates, ['hanetz', 'tzais'], out=[array('d', [0.0] * 3), np.zeros(2)])
+        with self.assertRaises(ValueError):
+            calendar.zmanim_columns(dates, ['hanetz', 'tzais'], out=np.zeros((1, 2)))
+        with self.assertRaises(ValueError):
+            calendar.zmanim_columns(dates, ['hanetz', 'tzais'], out=np.zeros((2, 2), dtype=np.int64))
+        with self.assertRaises(ValueError):
+            calendar.zmanim_columns(dates, ['hanetz', 'tzais'], out=[array('q', [0] * 2), np.zeros(2)])
+        with self.assertRaises(ValueError):
+            calendar.zmanim_columns(dates, ['hanetz', 'tzais'], mask=np.zeros((2, 2), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            calendar.zmanim_columns(dates, ['hanetz', 'tzais'], mask=[array('b', [0] * 2), np.zeros(2, dtype=bool)])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from test import test_helper
+from zmanim.hebrew_calendar.jewish_calendar import JewishCalendar
+from zmanim.zmanim_calendar import ZmanimCalendar
+from zmanim.zmanim_timeline import ZmanimTimeline
+
+
+class TestZmanimTimeline(unittest.TestCase):
+    def test_status(self):
+        geo = test_helper.lakewood()
+        timeline = ZmanimTimeline(ZmanimCalendar(geo_location=geo, date=date(2017, 10, 17)))
+        calendar = ZmanimCalendar(geo_location=geo, date=date(2017, 10, 17), output_mode='timestamp')
+        now = datetime(2017, 10, 17, 12, 0, tzinfo=geo.time_zone)
+        current, upcoming, remaining = timeline.status(now)
+        self.assertEqual(current[1:], ('sof_zman_tfila_gra', date(2017, 10, 17)))
+        self.assertEqual(upcoming[1:], ('chatzos', date(2017, 10, 17)))
+        self.assertEqual(upcoming[0], calendar.chatzos())
+        self.assertEqual(remaining, calendar.chatzos() - now.timestamp())
+        self.assertEqual(timeline.current(now), current)
+        self.assertEqual(timeline.next(now), upcoming)
+        self.assertEqual(timeline.remaining(now.timestamp()), remaining)
+
+    def test_period_before_alos_follows_previous_night(self):
+        geo = test_helper.lakewood()
+        timeline = ZmanimTimeline(ZmanimCalendar(geo_location=geo, date=date(2017, 10, 17)))
+        now = datetime(2017, 10, 17, 2, 0, tzinfo=geo.time_zone)
+        self.assertEqual(timeline.current(now)[1:], ('tzais', date(2017, 10, 16)))
+        self.assertEqual(timeline.next(now)[1:], ('alos', date(2017, 10, 17)))
+
+    def test_events_are_sorted(self):
+        timeline = ZmanimTimeline(ZmanimCalendar(geo_location=test_helper.lakewood(), date=date(2017, 10, 17)), days=10)
+        self.assertEqual(timeline.instants, sorted(timeline.instants))
+        self.assertEqual(len(timeline.instants), len(timeline.events))
+
+    def test_candle_lighting_and_havdalah(self):
+        geo = test_helper.lakewood()
+        calendar = ZmanimCalendar(geo_location=geo, date=date(2017, 10, 20), output_mode='timestamp')  # friday
+        timeline = ZmanimTimeline(calendar)
+        events = {(name, event_date): instant for instant, (name, event_date) in zip(timeline.instants, timeline.events)}
+        self.assertEqual(events[('candle_lighting', date(2017, 10, 20))], calendar.candle_lighting())
+        calendar.date = date(2017, 10, 21)
+        self.assertEqual(events[('havdalah', date(2017, 10, 21))], calendar.tzais())
+        self.assertNotIn(('havdalah', date(2017, 10, 20)), events)
+
+    def test_delayed_candle_lighting(self):
+        geo = test_helper.lakewood()
+        calendar = ZmanimCalendar(geo_location=geo, date=date(2018, 3, 31), output_mode='timestamp')  # first day of pesach, outside of israel
+        timeline = ZmanimTimeline(calendar, JewishCalendar(date(2018, 3, 31)))
+        events = {(name, event_date): instant for instant, (name, event_date) in zip(timeline.instants, timeline.events)}
+        self.assertEqual(events[('candle_lighting', date(2018, 3, 31))], calendar.tzais())
+        self.assertNotIn(('havdalah', date(2018, 3, 31)), events)
+
+        israel = ZmanimTimeline(calendar, JewishCalendar(date(2018, 3, 31), in_israel=True))
+        events = {(name, event_date) for name, event_date in israel.events}
+        self.assertIn(('havdalah', date(2018, 3, 31)), events)
+        self.assertNotIn(('candle_lighting', date(2018, 3, 31)), events)
+
+    def test_window_rolls_forward(self):
+        geo = test_helper.lakewood()
+        timeline = ZmanimTimeline(ZmanimCalendar(geo_location=geo, date=date(2017, 10, 17)))
+        self.assertEqual((timeline.first_date, timeline.last_date), (date(2017, 10, 16), date(2017, 10, 18)))
+        now = datetime(2017, 10, 17, 11, 0, tzinfo=geo.time_zone)  # before chatzos across the end of dst
+        for days in range(1, 40):
+            current, upcoming, _ = timeline.status(now + timedelta(days=days))
+            calendar = ZmanimCalendar(geo_location=geo, date=date(2017, 10, 17) + timedelta(days=days), output_mode='timestamp')
+            self.assertEqual(upcoming[1:], ('chatzos', calendar.date))
+            self.assertEqual(upcoming[0], calendar.chatzos())
+            self.assertEqual(timeline.date_time(upcoming[0]).date(), calendar.date)
+        self.assertEqual((timeline.first_date, timeline.last_date), (date(2017, 11, 24), date(2017, 11, 26)))
+        self.assertEqual(timeline.events[0], ('alos', date(2017, 11, 24)))
+
+    def test_polar_days_without_events(self):
+        calendar = ZmanimCalendar(geo_location=test_helper.arctic_nunavut(), date=date(2017, 6, 21))
+        timeline = ZmanimTimeline(calendar, names=['alos', 'hanetz', 'chatzos', 'shkia', 'tzais'])
+        self.assertEqual({name for name, _ in timeline.events}, {'chatzos'})
+        now = datetime(2017, 6, 21, 18, 0, tzinfo=calendar.geo_location.time_zone)
+        self.assertEqual(timeline.current(now)[1:], ('chatzos', date(2017, 6, 21)))
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            ZmanimTimeline(ZmanimCalendar(geo_location=test_helper.lakewood()), days=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,13 @@
-from datetime import date, datetime, timedelta
-from typing import Optional
+import math
+from copy import copy
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
 
 from dateutil import tz
 
 from zmanim.util.astronomical_calculations import AstronomicalCalculations
 from zmanim.util.geo_location import GeoLocation
+from zmanim.util.horizon_profile import HorizonProfile
 from zmanim.util.math_helper import MathHelper
 from zmanim.util.noaa_calculator import NOAACalculator
 
@@ -14,10 +17,15 @@ class AstronomicalCalendar(MathHelper):
     CIVIL_ZENITH = 96
     NAUTICAL_ZENITH = 102
     ASTRONOMICAL_ZENITH = 108
+    EXTREMES_SAMPLE_DAYS = 21
+    GOLDEN_RATIO = (1 + math.sqrt(5)) / 2
+    OUTPUT_MODES = ('datetime', 'timestamp')
+    UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
     __sentinel = object()
 
-    def __init__(self, geo_location: Optional[GeoLocation] = None, date: Optional[date] = None, calculator: Optional[AstronomicalCalculations] = None):
+    def __init__(self, geo_location: Optional[GeoLocation] = None, date: Optional[date] = None, calculator: Optional[AstronomicalCalculations] = None,
+                 output_mode: str = 'datetime'):
         if geo_location is None:
             geo_location = GeoLocation.GMT()
         if date is None:
@@ -27,40 +35,159 @@ class AstronomicalCalendar(MathHelper):
         self.geo_location = geo_location
         self.date = date
         self.astronomical_calculator = calculator
+        self.output_mode = output_mode
 
     def __repr__(self):
         return "%s(geo_location=%r, date=%r, calculator=%r)" % \
                (self.__module__ + "." + self.__class__.__qualname__, self.geo_location, self.date, self.astronomical_calculator)
 
+    @property
+    def geo_location(self) -> GeoLocation:
+        return self.__geo_location
+
+    @geo_location.setter
+    def geo_location(self, geo_location: GeoLocation):
+        self.__geo_location = geo_location
+        self.clear_cache()
+
+    @property
+    def date(self) -> date:
+        return self.__date
+
+    @date.setter
+    def date(self, date: date):
+        self.__date = date
+        self.clear_cache()
+
+    @property
+    def astronomical_calculator(self) -> AstronomicalCalculations:
+        return self.__astronomical_calculator
+
+    @astronomical_calculator.setter
+    def astronomical_calculator(self, calculator: AstronomicalCalculations):
+        self.__astronomical_calculator = calculator
+        self.clear_cache()
+
+    @property
+    def output_mode(self) -> str:
+        return self.__output_mode
+
+    @output_mode.setter
+    def output_mode(self, output_mode: str):
+        # 'timestamp' returns zmanim as float UTC epoch seconds, skipping datetime construction entirely
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError("output_mode must be one of %s" % ', '.join(self.OUTPUT_MODES))
+        self.__output_mode = output_mode
+        self.clear_cache()
+
+    def clear_cache(self):
+        self.__utc_sun_positions = {}
+        self.__sun_positions = {}
+
     def sunrise(self) -> Optional[datetime]:
-        return self._date_time_from_time_of_day(self.utc_sunrise(self.GEOMETRIC_ZENITH), 'sunrise')
+        return self._sun_position('sunrise', self.GEOMETRIC_ZENITH, True)
 
     def sea_level_sunrise(self) -> Optional[datetime]:
         return self.sunrise_offset_by_degrees(self.GEOMETRIC_ZENITH)
 
     def sunrise_offset_by_degrees(self, offset_zenith: float) -> Optional[datetime]:
-        return self._date_time_from_time_of_day(self.utc_sea_level_sunrise(offset_zenith), 'sunrise')
+        return self._sun_position('sunrise', offset_zenith, False)
 
     def sunset(self) -> Optional[datetime]:
-        return self._date_time_from_time_of_day(self.utc_sunset(self.GEOMETRIC_ZENITH), 'sunset')
+        return self._sun_position('sunset', self.GEOMETRIC_ZENITH, True)
 
     def sea_level_sunset(self) -> Optional[datetime]:
         return self.sunset_offset_by_degrees(self.GEOMETRIC_ZENITH)
 
     def sunset_offset_by_degrees(self, offset_zenith: float) -> Optional[datetime]:
-        return self._date_time_from_time_of_day(self.utc_sea_level_sunset(offset_zenith), 'sunset')
+        return self._sun_position('sunset', offset_zenith, False)
 
     def utc_sunrise(self, zenith: float) -> Optional[float]:
-        return self.astronomical_calculator.utc_sunrise(self._adjusted_date(), self.geo_location, zenith, adjust_for_elevation=True)
+        return self._utc_sun_position('sunrise', zenith, True)
 
     def utc_sea_level_sunrise(self, zenith: float) -> Optional[float]:
-        return self.astronomical_calculator.utc_sunrise(self._adjusted_date(), self.geo_location, zenith, adjust_for_elevation=False)
+        return self._utc_sun_position('sunrise', zenith, False)
 
     def utc_sunset(self, zenith: float) -> Optional[float]:
-        return self.astronomical_calculator.utc_sunset(self._adjusted_date(), self.geo_location, zenith, adjust_for_elevation=True)
+        return self._utc_sun_position('sunset', zenith, True)
 
     def utc_sea_level_sunset(self, zenith: float) -> Optional[float]:
-        return self.astronomical_calculator.utc_sunset(self._adjusted_date(), self.geo_location, zenith, adjust_for_elevation=False)
+        return self._utc_sun_position('sunset', zenith, False)
+
+    def utc_sunrise_batch(self, dates: Iterable[date], zenith: float):
+        return self.astronomical_calculator.utc_sunrise_batch(self._adjusted_dates(dates), self.geo_location, zenith, adjust_for_elevation=True)
+
+    def utc_sea_level_sunrise_batch(self, dates: Iterable[date], zenith: float):
+        return self.astronomical_calculator.utc_sunrise_batch(self._adjusted_dates(dates), self.geo_location, zenith, adjust_for_elevation=False)
+
+    def utc_sunset_batch(self, dates: Iterable[date], zenith: float):
+        return self.astronomical_calculator.utc_sunset_batch(self._adjusted_dates(dates), self.geo_location, zenith, adjust_for_elevation=True)
+
+    def utc_sea_level_sunset_batch(self, dates: Iterable[date], zenith: float):
+        return self.astronomical_calculator.utc_sunset_batch(self._adjusted_dates(dates), self.geo_location, zenith, adjust_for_elevation=False)
+
+    def visible_sunrise(self, horizon_profile: HorizonProfile) -> Optional[datetime]:
+        utc_time = self.astronomical_calculator.utc_visible_sunrise(self._adjusted_date(), self.geo_location, horizon_profile)
+        return self._time_from_time_of_day(utc_time, 'sunrise')
+
+    def visible_sunset(self, horizon_profile: HorizonProfile) -> Optional[datetime]:
+        utc_time = self.astronomical_calculator.utc_visible_sunset(self._adjusted_date(), self.geo_location, horizon_profile)
+        return self._time_from_time_of_day(utc_time, 'sunset')
+
+    def utc_visible_sunrise_batch(self, dates: Iterable[date], horizon_profile: HorizonProfile):
+        return self.astronomical_calculator.utc_visible_sunrise_batch(self._adjusted_dates(dates), self.geo_location, horizon_profile)
+
+    def utc_visible_sunset_batch(self, dates: Iterable[date], horizon_profile: HorizonProfile):
+        return self.astronomical_calculator.utc_visible_sunset_batch(self._adjusted_dates(dates), self.geo_location, horizon_profile)
+
+    def sun_altitude_crossing(self, altitude: float, mode: str = 'sunrise', precision: str = 'standard') -> Tuple[Optional[datetime], int]:
+        # the geometric altitude of the sun's center, so that 0 is not treated as the apparent horizon
+        utc_time, iterations = self.astronomical_calculator.utc_sun_position_solve(self._adjusted_date(), self.geo_location, 90.0 - altitude,
+                                                                                   mode=mode, precision=precision, apparent=False)
+        return self._time_from_time_of_day(utc_time, mode), iterations
+
+    def sun_position_steps(self, start_date: date, end_date: date, zenith: float = GEOMETRIC_ZENITH, mode: str = 'sunrise',
+                           adjust_for_elevation: bool = False) -> Iterator[Tuple[date, Optional[datetime]]]:
+        adjustment = timedelta(days=self.geo_location.antimeridian_adjustment())
+        steps = self.astronomical_calculator.utc_sun_position_steps(start_date + adjustment, end_date + adjustment, self.geo_location, zenith,
+                                                                   adjust_for_elevation=adjust_for_elevation, mode=mode)
+        for adjusted_date, utc_time in steps:
+            yield adjusted_date - adjustment, self._time_from_time_of_day(utc_time, mode, adjusted_date)
+
+    def annual_extremes(self, zman: Union[str, Callable[['AstronomicalCalendar'], Optional[datetime]]],
+                        year: Optional[int] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+        year = self.date.year if year is None else year
+        calendar = copy(self)
+
+        def time_of_day(ordinal: int) -> Optional[tuple]:
+            calendar.date = date.fromordinal(ordinal)
+            result = zman(calendar) if callable(zman) else getattr(calendar, zman)()
+            if result is None:
+                return None
+            clock_time = result if isinstance(result, datetime) else calendar.date_time_from_timestamp(result)
+            return (clock_time.replace(tzinfo=None) - datetime.combine(calendar.date, time())).total_seconds(), result
+
+        # clock times jump when the utc offset changes, so each span with a constant offset is searched on its own
+        earliest, latest = self._annual_extremes(time_of_day, self._utc_offset_spans(year))
+        return (None if earliest is None else earliest[1]), (None if latest is None else latest[1])
+
+    def day_length_extremes(self, year: Optional[int] = None) -> Tuple[Optional[Tuple[date, timedelta]], Optional[Tuple[date, timedelta]]]:
+        year = self.date.year if year is None else year
+        calendar = copy(self)
+
+        def day_length(ordinal: int) -> Optional[tuple]:
+            calendar.date = date.fromordinal(ordinal)
+            sunrise, sunset = calendar.sea_level_sunrise(), calendar.sea_level_sunset()
+            if sunrise is None or sunset is None:
+                return None
+            seconds = self._seconds_between(sunrise, sunset)
+            return seconds, (calendar.date, timedelta(seconds=seconds))
+
+        shortest, longest = self._annual_extremes(day_length, [(date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal())])
+        return (None if shortest is None else shortest[1]), (None if longest is None else longest[1])
+
+    def sun_event_type(self, zenith: float, mode: str = 'sunrise'):
+        return self.astronomical_calculator.sun_event_type(self._adjusted_date(), self.geo_location, zenith, adjust_for_elevation=False, mode=mode)
 
     def temporal_hour(self, sunrise: Optional[datetime] = __sentinel, sunset: Optional[datetime] = __sentinel) -> Optional[float]:
         if sunrise == self.__sentinel:
@@ -71,40 +198,223 @@ class AstronomicalCalendar(MathHelper):
         if sunset is None or sunrise is None:
             return None
 
-        daytime_hours = float((sunset - sunrise).total_seconds() / 3600.0)
+        daytime_hours = float(self._seconds_between(sunrise, sunset) / 3600.0)
         return (daytime_hours / 12) * self.HOUR_MILLIS
 
-    def sun_transit(self) -> Optional[datetime]:
-        sunrise = self.sea_level_sunrise()
-        sunset = self.sea_level_sunset()
-        if sunrise is None or sunset is None:
+    def sun_transit(self, day_start: Optional[datetime] = __sentinel, day_end: Optional[datetime] = __sentinel) -> Optional[datetime]:
+        if day_start == self.__sentinel and day_end == self.__sentinel:
+            return self.solar_noon()
+        if day_start == self.__sentinel:
+            day_start = self.sea_level_sunrise()
+        if day_end == self.__sentinel:
+            day_end = self.sea_level_sunset()
+
+        if day_start is None or day_end is None:
             return None
-        noon_hour = (self.temporal_hour(sunrise, sunset) / self.HOUR_MILLIS) * 6.0
-        return sunrise + timedelta(noon_hour / 24.0)
+        noon_hour = (self.temporal_hour(day_start, day_end) / self.HOUR_MILLIS) * 6.0
+        if not isinstance(day_start, datetime):
+            return day_start + (noon_hour * 3600.0)
+        return day_start + timedelta(noon_hour / 24.0)
 
-    def _date_time_from_time_of_day(self, time_of_day: Optional[float], mode: str) -> Optional[datetime]:
+    def solar_noon(self) -> Optional[datetime]:
+        return self._sun_position('noon', None, False)
+
+    def solar_midnight(self) -> Optional[datetime]:
+        return self._sun_position('midnight', None, False)
+
+    def date_time_from_timestamp(self, timestamp: Optional[float]) -> Optional[datetime]:
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, tz=self.geo_location.time_zone)
+
+    def utc_solar_noon(self) -> Optional[float]:
+        return self._utc_sun_position('noon', None, False)
+
+    def utc_solar_midnight(self) -> Optional[float]:
+        return self._utc_sun_position('midnight', None, False)
+
+    def _sun_position(self, mode: str, zenith: Optional[float], adjust_for_elevation: bool) -> Optional[datetime]:
+        key = (mode, zenith, adjust_for_elevation)
+        if key not in self.__sun_positions:
+            utc_time = self._utc_sun_position(mode, zenith, adjust_for_elevation)
+            self.__sun_positions[key] = self._time_from_time_of_day(utc_time, mode)
+        return self.__sun_positions[key]
+
+    def _utc_sun_position(self, mode: str, zenith: Optional[float], adjust_for_elevation: bool) -> Optional[float]:
+        key = (mode, zenith, adjust_for_elevation)
+        if key not in self.__utc_sun_positions:
+            calculator, target_date = self.astronomical_calculator, self._adjusted_date()
+            if mode == 'noon':
+                utc_time = calculator.utc_solar_noon(target_date, self.geo_location)
+            elif mode == 'midnight':
+                utc_time = calculator.utc_solar_midnight(target_date, self.geo_location)
+            else:
+                calculation = calculator.utc_sunrise if mode == 'sunrise' else calculator.utc_sunset
+                utc_time = calculation(target_date, self.geo_location, zenith, adjust_for_elevation=adjust_for_elevation)
+            self.__utc_sun_positions[key] = utc_time
+        return self.__utc_sun_positions[key]
+
+    def _prefetch_sun_positions(self, mode: str, zeniths: Iterable[float], adjust_for_elevation: bool):
+        # solves every zenith not yet memoized in a single pass of the calculator
+        missing = [zenith for zenith in zeniths if (mode, zenith, adjust_for_elevation) not in self.__utc_sun_positions]
+        if not missing:
+            return
+        results = self.astronomical_calculator.utc_sun_positions(self._adjusted_date(), self.geo_location, missing,
+                                                                  adjust_for_elevation=adjust_for_elevation, modes=(mode,))
+        for (zenith, _), utc_time in results.items():
+            self.__utc_sun_positions[(mode, zenith, adjust_for_elevation)] = utc_time
+
+    def _sun_position_timestamps(self, dates, mode: str, zenith: Optional[float], adjust_for_elevation: bool):
+        # float UTC epoch seconds for each date, NaN where the event does not occur
+        import numpy as np
+
+        calculator, adjusted_dates = self.astronomical_calculator, self._adjusted_dates(dates)
+        if mode == 'noon':
+            utc_time = calculator.utc_solar_noon_batch(adjusted_dates, self.geo_location)
+        elif mode == 'midnight':
+            utc_time = calculator.utc_solar_midnight_batch(adjusted_dates, self.geo_location)
+        else:
+            calculation = calculator.utc_sunrise_batch if mode == 'sunrise' else calculator.utc_sunset_batch
+            utc_time = calculation(adjusted_dates, self.geo_location, zenith, adjust_for_elevation=adjust_for_elevation)
+        days = adjusted_dates.astype(np.int64) + self._utc_day_shift_array(np.floor(utc_time), mode)
+        return (days * 86400.0) + (utc_time * 3600.0)
+
+    def _time_from_time_of_day(self, time_of_day: Optional[float], mode: str, adjusted_date: Optional[date] = None) -> Union[datetime, float, None]:
+        if self.output_mode == 'timestamp':
+            return self._timestamp_from_time_of_day(time_of_day, mode, adjusted_date)
+        return self._date_time_from_time_of_day(time_of_day, mode, adjusted_date)
+
+    def _timestamp_from_time_of_day(self, time_of_day: Optional[float], mode: str, adjusted_date: Optional[date] = None) -> Optional[float]:
+        if time_of_day is None:
+            return None
+
+        if adjusted_date is None:
+            adjusted_date = self._adjusted_date()
+        days = adjusted_date.toordinal() - self.UNIX_EPOCH_ORDINAL + self._utc_day_shift(math.floor(time_of_day), mode)
+        return (days * 86400.0) + (time_of_day * 3600.0)  # seconds since the epoch
+
+    def _date_time_from_time_of_day(self, time_of_day: Optional[float], mode: str, adjusted_date: Optional[date] = None) -> Optional[datetime]:
         if time_of_day is None:
             return None
 
         hours, remainder = divmod(time_of_day * 3600, 3600)
         minutes, remainder = divmod(remainder, 60)
         seconds, microseconds = divmod(remainder * 10**6, 10**6)
-        adjusted_date = self._adjusted_date()
+        if adjusted_date is None:
+            adjusted_date = self._adjusted_date()
         year, month, day = adjusted_date.year, adjusted_date.month, adjusted_date.day
         utc_time = datetime(year, month, day, int(hours), int(minutes), int(seconds), int(microseconds), tzinfo=tz.tzutc())
 
+        day_shift = self._utc_day_shift(hours, mode)
+        if day_shift != 0:
+            utc_time += timedelta(day_shift)
+
+        return self._convert_date_time_for_zone(utc_time)
+
+    def _utc_day_shift(self, hours: float, mode: str) -> int:
         # adjust date if utc time reflects a wraparound from the local offset
         local_offset = (self.geo_location.local_mean_time_offset() + self.geo_location.standard_time_offset()) / self.HOUR_MILLIS
         if hours + local_offset > 18 and mode == 'sunrise':  # sunrise after 6pm indicates the UTC date has occurred earlier
-            utc_time -= timedelta(1)
+            return -1
         elif hours + local_offset < 6 and mode == 'sunset':  # sunset before 6am indicates the UTC date has occurred later
-            utc_time += timedelta(1)
+            return 1
+        elif mode == 'noon' and not 0 <= hours + local_offset < 24:  # noon wraps only for offsets near the antimeridian
+            return -1 if hours + local_offset >= 24 else 1
+        elif mode == 'midnight' and not 12 <= hours + local_offset < 36:  # midnight follows the local noon
+            return -1 if hours + local_offset >= 36 else 1
+        return 0
 
-        return self._convert_date_time_for_zone(utc_time)
+    def _utc_day_shift_array(self, hours, mode: str):
+        import numpy as np
+
+        local_hours = hours + ((self.geo_location.local_mean_time_offset() + self.geo_location.standard_time_offset()) / self.HOUR_MILLIS)
+        if mode == 'sunrise':
+            return np.where(local_hours > 18, -1, 0)
+        elif mode == 'sunset':
+            return np.where(local_hours < 6, 1, 0)
+        elif mode == 'noon':
+            return np.where(local_hours >= 24, -1, np.where(local_hours < 0, 1, 0))
+        return np.where(local_hours >= 36, -1, np.where(local_hours < 12, 1, 0))
+
+    def _seconds_between(self, start: Union[datetime, float], end: Union[datetime, float]) -> float:
+        elapsed = end - start
+        return elapsed.total_seconds() if isinstance(elapsed, timedelta) else elapsed
 
     def _adjusted_date(self) -> date:
         return self.date + timedelta(days=self.geo_location.antimeridian_adjustment())
 
+    def _adjusted_dates(self, dates: Iterable[date]):
+        import numpy as np
+
+        return np.asarray(dates, dtype='datetime64[D]') + self.geo_location.antimeridian_adjustment()
+
+    def _annual_extremes(self, evaluate: Callable[[int], Optional[tuple]], spans: Iterable[Tuple[int, int]]) -> Tuple[Optional[tuple], Optional[tuple]]:
+        evaluations = {}
+
+        def value(ordinal: int, sign: int) -> float:
+            if ordinal not in evaluations:
+                evaluations[ordinal] = evaluate(ordinal)
+            result = evaluations[ordinal]
+            return math.inf if result is None else sign * result[0]
+
+        candidates = set()
+        for first, last in spans:
+            samples = list(range(first, last, self.EXTREMES_SAMPLE_DAYS)) + [last]
+            for sign in (1, -1):  # minimum, then maximum
+                candidates.update(self._bracketed_extremes(lambda ordinal: value(ordinal, sign), samples))
+
+        found = [evaluations[ordinal] for ordinal in sorted(candidates) if evaluations.get(ordinal) is not None]
+        if not found:
+            return None, None
+        return min(found, key=lambda result: result[0]), max(found, key=lambda result: result[0])
+
+    def _bracketed_extremes(self, value: Callable[[int], float], samples: list) -> list:
+        first, last = samples[0], samples[-1]
+        minimums = []
+        for index, middle in enumerate(samples):
+            # a sample no worse than its neighbours brackets a local minimum, including at the ends of the span
+            low, high = samples[max(index - 1, 0)], samples[min(index + 1, len(samples) - 1)]
+            if value(middle) == math.inf or value(middle) > min(value(low), value(high)):
+                continue
+            if low == high or (middle == first and value(first) <= value(first + 1)) or (middle == last and value(last) <= value(last - 1)):
+                minimums.append(middle)  # the curve moves away from the end of the span
+                continue
+            # keep the search within the days where the zman occurs
+            if value(low) == math.inf:
+                low = self._defined_boundary(value, middle, low)
+            if value(high) == math.inf:
+                high = self._defined_boundary(value, middle, high)
+            minimums.append(self._golden_section_search(value, low, high))
+        return minimums
+
+    def _defined_boundary(self, value: Callable[[int], float], inside: int, outside: int) -> int:
+        while abs(outside - inside) > 1:
+            middle = (inside + outside) // 2
+            if value(middle) < math.inf:
+                inside = middle
+            else:
+                outside = middle
+        return inside
+
+    def _golden_section_search(self, value: Callable[[int], float], low: int, high: int) -> int:
+        # narrows an integer bracket around a minimum, reusing one interior point per step
+        while high - low > 3:
+            step = round((high - low) / self.GOLDEN_RATIO)
+            left, right = high - step, low + step
+            if left >= right:
+                left, right = right - 1, right
+            if value(left) <= value(right):
+                high = right
+            else:
+                low = left
+        return min(range(low, high + 1), key=value)
+
+    def _utc_offset_spans(self, year: int) -> list:
+        # (first, last) ordinals of each stretch of the year sharing one utc offset
+        last = date(year, 12, 31)
+        starts = [start.toordinal() for start, _ in self.geo_location.utc_offset_transitions(date(year, 1, 1), last)]
+        return list(zip(starts, [start - 1 for start in starts[1:]] + [last.toordinal()]))
+
     def _convert_date_time_for_zone(self, utc_time: datetime) -> datetime:
         return utc_time.astimezone(self.geo_location.time_zone)
 
@@ -0,0 +1,31 @@
+from datetime import date
+from typing import Iterator, Tuple
+
+
+# Every standard zman for one day, evaluated together so shared events and shaos zmaniyos are computed once
+class DailyZmanim:
+    ZMANIM = ('alos', 'alos_72', 'hanetz', 'sof_zman_shma_mga', 'sof_zman_shma_gra', 'sof_zman_tfila_mga', 'sof_zman_tfila_gra',
+              'chatzos', 'mincha_gedola', 'mincha_ketana', 'plag_hamincha', 'candle_lighting', 'shkia', 'tzais', 'tzais_72',
+              'shaah_zmanis_gra', 'shaah_zmanis_mga')
+
+    __slots__ = ('date',) + ZMANIM
+
+    def __init__(self, date: date, values: dict):
+        self.date = date
+        for name in self.ZMANIM:
+            setattr(self, name, values[name])
+
+    def __repr__(self):
+        return "%s(date=%r, %s)" % (self.__module__ + "." + self.__class__.__qualname__, self.date,
+                                    ', '.join('%s=%r' % (name, getattr(self, name)) for name in self.ZMANIM))
+
+    def __eq__(self, other):
+        if not isinstance(other, DailyZmanim):
+            return NotImplemented
+        return self.date == other.date and all(getattr(self, name) == getattr(other, name) for name in self.ZMANIM)
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        return ((name, getattr(self, name)) for name in self.ZMANIM)
+
+    def as_dict(self) -> dict:
+        return dict(self)
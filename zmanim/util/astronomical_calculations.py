@@ -1,18 +1,150 @@
 import math
+from datetime import date, timedelta
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
+
+from zmanim.util.geo_location import GeoLocation
+from zmanim.util.horizon_profile import HorizonProfile
+from zmanim.util.refraction import ConstantRefraction
 
 
 class AstronomicalCalculations:
     GEOMETRIC_ZENITH = 90.0
+    SUN_EVENTS = Enum('SunEvents', 'event always_above always_below')
+    PRECISIONS = ('fast', 'standard', 'converged')
+
+    ELEVATION_CACHE_SIZE = 1024
+
+    # the visible event is searched in steps from the sea level event for the lowest point of the horizon
+    HORIZON_SCAN_STEP = 2.0  # minutes
+    HORIZON_BISECTIONS = 7  # narrows the step to under a second
 
     def __init__(self):
-        self.refraction = 34 / 60.0
+        self.refraction_model = ConstantRefraction()
         self.solar_radius = 16 / 60.0
         self.earth_radius = 6356.9  # km
 
+    @property
+    def refraction(self) -> float:
+        return self.refraction_model.horizon_refraction()
+
+    @refraction.setter
+    def refraction(self, refraction: float):
+        self.refraction_model = ConstantRefraction(refraction)
+
     def elevation_adjustment(self, elevation: float) -> float:
-        return math.degrees(math.acos(self.earth_radius / (self.earth_radius + (elevation / 1000.0))))
+        return self._elevation_adjustment(self.earth_radius, elevation)
 
     def adjusted_zenith(self, zenith: float, elevation: float) -> float:
         if zenith != self.GEOMETRIC_ZENITH:
             return zenith
-        return zenith + self.solar_radius + self.refraction + self.elevation_adjustment(elevation)
\ No newline at end of file
+        return zenith + self.solar_radius + self.refraction_model.horizon_refraction(elevation) + self.elevation_adjustment(elevation)
+
+    def utc_sun_positions(self, target_date: date, geo_location: GeoLocation, zeniths: Iterable[float], adjust_for_elevation: bool = False,
+                          modes: Iterable[str] = ('sunrise', 'sunset')) -> dict:
+        calculations = {'sunrise': self.utc_sunrise, 'sunset': self.utc_sunset}
+        return {(zenith, mode): calculations[mode](target_date, geo_location, zenith, adjust_for_elevation)
+                for zenith in zeniths for mode in modes}
+
+    def utc_sun_position_solve(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False,
+                               mode: str = 'sunrise', precision: str = 'standard', apparent: bool = True) -> Tuple[Optional[float], int]:
+        # a non-apparent zenith is taken as given, without refraction, solar radius or elevation applied to the geometric zenith
+        self._validate_precision(precision)
+        if apparent:
+            zenith = self.adjusted_zenith(zenith, geo_location.elevation if adjust_for_elevation else 0.0)
+        return self._utc_sun_position_at_zenith(target_date, geo_location, zenith, mode), 1  # closed form, evaluated once
+
+    def utc_sun_position_steps(self, start_date: date, end_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False,
+                               mode: str = 'sunrise') -> Iterator[Tuple[date, Optional[float]]]:
+        calculation = self.utc_sunrise if mode == 'sunrise' else self.utc_sunset
+        for offset in range((end_date - start_date).days + 1):
+            target_date = start_date + timedelta(days=offset)
+            yield target_date, calculation(target_date, geo_location, zenith, adjust_for_elevation)
+
+    def utc_visible_sunrise(self, target_date: date, geo_location: GeoLocation, horizon_profile: HorizonProfile) -> Optional[float]:
+        return self._utc_visible_sun_position(target_date, geo_location, horizon_profile, 'sunrise')
+
+    def utc_visible_sunset(self, target_date: date, geo_location: GeoLocation, horizon_profile: HorizonProfile) -> Optional[float]:
+        return self._utc_visible_sun_position(target_date, geo_location, horizon_profile, 'sunset')
+
+    def utc_visible_sunrise_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, horizon_profile: HorizonProfile):
+        return self._utc_visible_sun_position_batch(target_dates, geo_location, horizon_profile, 'sunrise')
+
+    def utc_visible_sunset_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, horizon_profile: HorizonProfile):
+        return self._utc_visible_sun_position_batch(target_dates, geo_location, horizon_profile, 'sunset')
+
+    @staticmethod
+    @lru_cache(maxsize=ELEVATION_CACHE_SIZE)
+    def _elevation_adjustment(earth_radius: float, elevation: float) -> float:
+        # horizon dip, shared across instances with the same earth radius
+        return math.degrees(math.acos(earth_radius / (earth_radius + (elevation / 1000.0))))
+
+    def _validate_precision(self, precision: str):
+        if precision not in self.PRECISIONS:
+            raise ValueError("precision must be one of %s" % ", ".join(self.PRECISIONS))
+
+    def _utc_visible_sun_position(self, target_date: date, geo_location: GeoLocation, horizon_profile: HorizonProfile, mode: str) -> Optional[float]:
+        direction = 1 if mode == 'sunrise' else -1  # sunset is searched backwards, towards solar noon
+
+        # the sun cannot clear the horizon before it reaches the lowest point of the profile
+        start = self._utc_sun_position_at_zenith(target_date, geo_location, self._horizon_zenith(horizon_profile, geo_location.elevation), mode)
+        if start is None:
+            return None
+        # in hours from midnight UTC of the target date, the event falling within half a day of solar noon
+        noon = self.utc_solar_noon(target_date, geo_location)
+        noon += 24.0 * round((12.0 - (geo_location.longitude / 15.0) - noon) / 24.0)
+        start += 24.0 * round((noon - start) / 24.0)
+
+        def clearance(hours: float) -> float:
+            elevation, azimuth = self._sun_elevation_azimuth_at(target_date, geo_location, hours)
+            upper_limb = elevation + self.solar_radius
+            return upper_limb + self.refraction_model.refraction(upper_limb, geo_location.elevation) - horizon_profile.elevation_at(azimuth)
+
+        step = self.HORIZON_SCAN_STEP / 60.0  # in hours
+        hidden = start - (direction * step)
+        visible = start
+        while clearance(visible) < 0:
+            hidden, visible = visible, visible + (direction * step)
+            if direction * (visible - noon) > 0:
+                return None  # the sun stays behind the horizon profile
+        for _ in range(self.HORIZON_BISECTIONS):
+            middle = (hidden + visible) / 2.0
+            if clearance(middle) < 0:
+                hidden = middle
+            else:
+                visible = middle
+        return visible % 24  # normalized (0...24)
+
+    def _utc_visible_sun_position_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, horizon_profile: HorizonProfile, mode: str):
+        import numpy as np
+
+        utc_times = [self._utc_visible_sun_position(target_date, geo_location, horizon_profile, mode)
+                     for target_date in np.asarray(target_dates, dtype='datetime64[D]').astype(date)]
+        return np.array([np.nan if utc_time is None else utc_time for utc_time in utc_times], dtype=np.float64)  # NaN where the sun does not clear the horizon profile
+
+    def _sun_elevation_azimuth_at(self, target_date: date, geo_location: GeoLocation, utc_hours: float) -> Tuple[float, float]:
+        raise NotImplementedError("%s does not provide the sun's position needed to search a horizon profile" % self.__class__.__name__)
+
+    def _horizon_zenith(self, horizon_profile: HorizonProfile, elevation: float) -> float:
+        # refraction a degree below the profile bounds the refraction where the sun first reaches it
+        refraction = self.refraction_model.refraction(horizon_profile.min_elevation - 1.0, elevation)
+        return self.GEOMETRIC_ZENITH + refraction + self.solar_radius - horizon_profile.min_elevation
+
+    def _sun_elevation_azimuth(self, latitude: float, solar_dec: float, hour_angle: float) -> Tuple[float, float]:
+        lat_r = math.radians(latitude)
+        solar_dec_r = math.radians(solar_dec)
+        hour_angle_r = math.radians(hour_angle)
+
+        cos_zenith = (math.sin(lat_r) * math.sin(solar_dec_r)) + (math.cos(lat_r) * math.cos(solar_dec_r) * math.cos(hour_angle_r))
+        elevation = 90.0 - math.degrees(math.acos(min(max(cos_zenith, -1.0), 1.0)))
+        azimuth = math.degrees(math.atan2(math.sin(hour_angle_r),
+                                          (math.cos(hour_angle_r) * math.sin(lat_r)) - (math.tan(solar_dec_r) * math.cos(lat_r))))
+        return elevation, (azimuth + 180.0) % 360  # in degrees, azimuth clockwise from north
+
+    def _sun_event(self, cos_hour_angle: float):
+        if cos_hour_angle > 1:  # the sun's highest altitude is still below the zenith
+            return self.SUN_EVENTS.always_below
+        if cos_hour_angle < -1:  # the sun's lowest altitude is still above the zenith
+            return self.SUN_EVENTS.always_above
+        return self.SUN_EVENTS.event
@@ -1,5 +1,6 @@
-from datetime import datetime
-from typing import Optional
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import List, Optional, Tuple
 
 from dateutil import tz
 
@@ -7,6 +8,10 @@ from zmanim.util.math_helper import MathHelper
 
 
 class GeoLocation(MathHelper):
+    TRANSITION_TABLE_YEARS = (1800, 2200)
+
+    # standard time offset transitions (ordinals, offsets) keyed by time zone representation, shared across instances
+    _transition_tables = {}
 
     def __init__(self, name: str, latitude: float, longitude: float, time_zone, elevation: Optional[float] = None):
         self.location_name = name
@@ -60,6 +65,7 @@ class GeoLocation(MathHelper):
             self.__longitude = temp
         else:
             raise TypeError("input must be a number or a list in the format 'degrees,minutes,seconds,direction'")
+        self._clear_offset_cache()
 
     @property
     def time_zone(self) -> tz.tzfile:
@@ -73,6 +79,8 @@ class GeoLocation(MathHelper):
             self.__time_zone = time_zone
         else:
             raise TypeError("input must be a timezone or string")
+        self.__standard_time_offset = None
+        self._clear_offset_cache()
 
     @property
     def elevation(self) -> float:
@@ -96,20 +104,70 @@ class GeoLocation(MathHelper):
         return cls('Greenwich, England', 51.4772, 0, 'GMT')
 
     def antimeridian_adjustment(self) -> int:
-        local_hours_offset = self.local_mean_time_offset() / float(self.HOUR_MILLIS)
-        if local_hours_offset >= 20:
-            return 1
-        elif local_hours_offset <= -20:
-            return -1
-        else:
-            return 0
+        if self.__antimeridian_adjustment is None:
+            local_hours_offset = self.local_mean_time_offset() / float(self.HOUR_MILLIS)
+            if local_hours_offset >= 20:
+                self.__antimeridian_adjustment = 1
+            elif local_hours_offset <= -20:
+                self.__antimeridian_adjustment = -1
+            else:
+                self.__antimeridian_adjustment = 0
+        return self.__antimeridian_adjustment
 
     def local_mean_time_offset(self) -> float:
-        return (self.longitude * 4 * self.MINUTE_MILLIS) - self.standard_time_offset()
+        if self.__local_mean_time_offset is None:
+            self.__local_mean_time_offset = (self.longitude * 4 * self.MINUTE_MILLIS) - self.standard_time_offset()
+        return self.__local_mean_time_offset
 
     def standard_time_offset(self) -> int:
-        now = datetime.now(tz=self.time_zone)
-        return int((now.utcoffset() - now.dst()).total_seconds()) * 1000
+        if self.__standard_time_offset is None:
+            now = datetime.now(tz=self.time_zone)
+            self.__standard_time_offset = int((now.utcoffset() - now.dst()).total_seconds()) * 1000
+        return self.__standard_time_offset
+
+    def standard_time_offset_at(self, target_date: date) -> int:
+        ordinals, offsets = self._transition_table()
+        return offsets[max(bisect_right(ordinals, target_date.toordinal()) - 1, 0)]
 
     def time_zone_offset_at(self, utc_time: datetime) -> float:
         return utc_time.astimezone(self.time_zone).utcoffset().total_seconds() / 3600.0
+
+    def utc_offset_transitions(self, start_date: date, end_date: date, include_dst: bool = True) -> List[Tuple[date, int]]:
+        # the first date and the offset at local noon of each utc offset in effect from start_date through end_date
+        def offset(ordinal: int) -> int:
+            return self._utc_offset_on(date.fromordinal(ordinal), include_dst)
+
+        first, last = start_date.toordinal(), end_date.toordinal()
+        probes = [date(year, month, 1).toordinal() for year in range(start_date.year, end_date.year + 1) for month in range(1, 13)]
+        transitions, low = [(first, offset(first))], first
+        for probe in [probe for probe in probes if first < probe < last] + [last]:
+            while offset(probe) != transitions[-1][1]:
+                # bisect the month for the first date using the new offset
+                high = probe
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if offset(middle) == transitions[-1][1]:
+                        low = middle
+                    else:
+                        high = middle
+                transitions.append((high, offset(high)))
+                low = high
+            low = probe
+        return [(date.fromordinal(ordinal), offset_millis) for ordinal, offset_millis in transitions]
+
+    def _clear_offset_cache(self):
+        self.__local_mean_time_offset = None
+        self.__antimeridian_adjustment = None
+
+    def _transition_table(self) -> tuple:
+        key = repr(self.time_zone)
+        if key not in self._transition_tables:
+            first_year, last_year = self.TRANSITION_TABLE_YEARS
+            transitions = self.utc_offset_transitions(date(first_year, 1, 1), date(last_year, 12, 31), include_dst=False)
+            self._transition_tables[key] = ([start.toordinal() for start, _ in transitions], [offset for _, offset in transitions])
+        return self._transition_tables[key]
+
+    def _utc_offset_on(self, target_date: date, include_dst: bool) -> int:
+        local_noon = datetime(target_date.year, target_date.month, target_date.day, 12, tzinfo=self.time_zone)
+        offset = local_noon.utcoffset() if include_dst else local_noon.utcoffset() - local_noon.dst()
+        return int(offset.total_seconds()) * 1000
@@ -0,0 +1,88 @@
+import math
+import os
+from bisect import bisect_right
+from typing import Iterable, Sequence, Tuple
+
+
+# Angular elevation of the visible horizon (degrees above the astronomical horizon) in equal azimuth bins,
+# starting from north and proceeding clockwise. Terrain scans are expensive, so loaded profiles are cached by file.
+class HorizonProfile:
+    DEFAULT_BINS = 360
+
+    # profiles keyed by (path, modification time), shared across locations and calendars
+    _profiles = {}
+
+    def __init__(self, elevations: Sequence[float]):
+        if len(elevations) == 0:
+            raise ValueError("a horizon profile needs at least one elevation")
+        self.elevations = tuple(float(elevation) for elevation in elevations)
+        self.bin_width = 360.0 / len(self.elevations)
+        self.min_elevation = min(self.elevations)
+        self.max_elevation = max(self.elevations)
+
+    def __repr__(self):
+        return "%s(bins=%r, min_elevation=%r, max_elevation=%r)" % \
+               (self.__module__ + "." + self.__class__.__qualname__, len(self.elevations), self.min_elevation, self.max_elevation)
+
+    @classmethod
+    def flat(cls, elevation: float = 0.0) -> 'HorizonProfile':
+        return cls([elevation])
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[Tuple[float, float]], bins: int = DEFAULT_BINS) -> 'HorizonProfile':
+        samples = sorted((azimuth % 360, elevation) for azimuth, elevation in samples)
+        if len(samples) == 0:
+            raise ValueError("a horizon profile needs at least one sample")
+        # wrap around north so every bin center falls between two samples
+        azimuths = [samples[-1][0] - 360] + [azimuth for azimuth, _ in samples] + [samples[0][0] + 360]
+        elevations = [samples[-1][1]] + [elevation for _, elevation in samples] + [samples[0][1]]
+        return cls([cls._interpolate(azimuths, elevations, index * 360.0 / bins) for index in range(bins)])
+
+    @classmethod
+    def load(cls, path: str, bins: int = DEFAULT_BINS) -> 'HorizonProfile':
+        path = os.path.abspath(path)
+        key = (path, os.path.getmtime(path), bins)
+        if key not in cls._profiles:
+            with open(path) as file:
+                cls._profiles[key] = cls.from_samples(cls._parse(file), bins)
+        return cls._profiles[key]
+
+    @classmethod
+    def clear_cache(cls):
+        cls._profiles.clear()
+
+    def elevation_at(self, azimuth: float) -> float:
+        position = (azimuth % 360) / self.bin_width
+        index = math.floor(position)
+        fraction = position - index
+        lower = self.elevations[index % len(self.elevations)]
+        upper = self.elevations[(index + 1) % len(self.elevations)]
+        return lower + ((upper - lower) * fraction)
+
+    def elevation_at_array(self, azimuths):
+        import numpy as np
+
+        elevations = np.append(self.elevations, self.elevations[0])  # close the circle at 360
+        bin_azimuths = np.arange(len(elevations)) * self.bin_width
+        return np.interp(np.mod(azimuths, 360), bin_azimuths, elevations)
+
+    @staticmethod
+    def _parse(lines: Iterable[str]) -> list:
+        samples = []
+        for line in lines:
+            line = line.split('#', 1)[0].replace(',', ' ').strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                raise ValueError("horizon profile lines must be in the format 'azimuth elevation'")
+            samples.append((float(parts[0]), float(parts[1])))
+        return samples
+
+    @staticmethod
+    def _interpolate(azimuths: list, elevations: list, azimuth: float) -> float:
+        index = min(max(bisect_right(azimuths, azimuth), 1), len(azimuths) - 1)
+        low, high = azimuths[index - 1], azimuths[index]
+        if high == low:
+            return elevations[index]
+        return elevations[index - 1] + ((elevations[index] - elevations[index - 1]) * (azimuth - low) / (high - low))
@@ -0,0 +1,278 @@
+import math
+from typing import Optional, Tuple
+
+from zmanim.util.noaa_calculator import NOAACalculator
+
+
+# NOAA algorithm with the ephemeris taken from the truncated VSOP87 series for the Earth given in Meeus,
+# Astronomical Algorithms (2nd ed.), appendix III, corrected to FK5, nutation and aberration, and evaluated
+# in dynamical time. `terms` limits the number of terms used from each series, trading accuracy for speed.
+class MeeusCalculator(NOAACalculator):
+    JULIAN_DAYS_PER_MILLENNIUM = 365250.0
+
+    # (amplitude, phase, frequency) per term, amplitudes in 1e-8 radians (longitude, latitude) or astronomical units (radius)
+    LONGITUDE_SERIES = (
+        ((175347046, 0, 0), (3341656, 4.6692568, 6283.07585), (34894, 4.6261, 12566.1517), (3497, 2.7441, 5753.3849),
+         (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715), (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097),
+         (1324, 0.7425, 11506.7698), (1273, 2.0371, 529.691), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+         (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694), (753, 2.533, 5507.553),
+         (505, 4.583, 18849.228), (492, 4.205, 775.523), (357, 2.92, 0.067), (317, 5.849, 11790.629),
+         (284, 1.899, 796.298), (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+         (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299), (132, 3.411, 2942.463),
+         (126, 1.083, 20.775), (115, 0.645, 0.98), (103, 0.636, 4694.003), (102, 0.976, 15720.839),
+         (102, 4.267, 7.114), (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+         (85, 1.3, 6275.96), (85, 3.67, 71430.7), (80, 1.81, 17260.15), (79, 3.04, 12036.46),
+         (75, 1.76, 5088.63), (74, 3.5, 3154.69), (74, 4.68, 801.82), (70, 0.83, 9437.76),
+         (62, 3.98, 8827.39), (61, 1.82, 7084.9), (57, 2.78, 6286.6), (56, 4.39, 14143.5),
+         (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02), (51, 0.28, 5856.48),
+         (49, 0.49, 1194.45), (41, 5.37, 8429.24), (41, 2.4, 19651.05), (39, 6.17, 10447.39),
+         (37, 6.04, 10213.29), (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+         (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87), (25, 3.16, 4690.48)),
+        ((628331966747, 0, 0), (206059, 2.678235, 6283.07585), (4303, 2.6351, 12566.1517), (425, 1.59, 3.523),
+         (119, 5.796, 26.298), (109, 2.966, 1577.344), (93, 2.59, 18849.23), (72, 1.14, 529.69),
+         (68, 1.87, 398.15), (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+         (45, 0.4, 796.3), (36, 0.47, 775.52), (29, 2.65, 7.11), (21, 5.34, 0.98),
+         (19, 1.85, 5486.78), (19, 4.97, 213.3), (17, 2.99, 6275.96), (16, 0.03, 2544.31),
+         (16, 1.43, 2146.17), (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+         (12, 5.27, 1194.45), (12, 2.08, 4694.0), (11, 0.77, 553.57), (10, 1.3, 6286.6),
+         (10, 4.24, 1349.87), (9, 2.7, 242.73), (9, 5.64, 951.72), (8, 5.3, 2352.87),
+         (6, 2.65, 9437.76), (6, 4.67, 4690.48)),
+        ((52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152), (27, 0.05, 3.52),
+         (16, 5.19, 26.3), (16, 3.68, 155.42), (10, 0.76, 18849.23), (9, 2.06, 77713.77),
+         (7, 0.83, 775.52), (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+         (3, 5.14, 796.3), (3, 6.05, 5507.55), (3, 1.19, 242.73), (3, 6.12, 529.69),
+         (3, 0.31, 398.15), (3, 2.28, 553.57), (2, 4.38, 5223.69), (2, 3.75, 0.98)),
+        ((289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15), (3, 5.2, 155.42),
+         (1, 4.72, 3.52), (1, 5.3, 18849.23), (1, 5.97, 242.73)),
+        ((114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15)),
+        ((1, 3.14, 0),),
+    )
+    LATITUDE_SERIES = (
+        ((280, 3.199, 84334.662), (102, 5.422, 5507.553), (80, 3.88, 5223.69), (44, 3.7, 2352.87),
+         (32, 4.0, 1577.34)),
+        ((9, 3.9, 5507.55), (6, 1.73, 5223.69)),
+    )
+    RADIUS_SERIES = (
+        ((100013989, 0, 0), (1670700, 3.0984635, 6283.07585), (13956, 3.05525, 12566.1517), (3084, 5.1985, 77713.7715),
+         (1628, 1.1739, 5753.3849), (1576, 2.8469, 7860.4194), (925, 5.453, 11506.77), (542, 4.564, 3930.21),
+         (472, 3.661, 5884.927), (346, 0.964, 5507.553), (329, 5.9, 5223.694), (307, 0.299, 5573.143),
+         (243, 4.273, 11790.629), (212, 5.847, 1577.344), (186, 5.022, 10977.079), (175, 3.012, 18849.228),
+         (110, 5.055, 5486.778), (98, 0.89, 6069.78), (86, 5.69, 15720.84), (86, 1.27, 161000.69),
+         (65, 0.27, 17260.15), (63, 0.92, 529.69), (57, 2.01, 83996.85), (56, 5.24, 71430.7),
+         (49, 3.25, 2544.31), (47, 2.58, 775.52), (45, 5.54, 9437.76), (43, 6.01, 6275.96),
+         (39, 5.36, 4694.0), (38, 2.39, 8827.39), (37, 0.83, 19651.05), (37, 4.9, 12139.55),
+         (36, 1.67, 12036.46), (35, 1.84, 2942.46), (33, 0.24, 7084.9), (32, 0.18, 5088.63),
+         (32, 1.78, 398.15), (28, 1.21, 6286.6), (28, 1.9, 6279.55), (26, 4.59, 10447.39)),
+        ((103019, 1.10749, 6283.07585), (1721, 1.0644, 12566.1517), (702, 3.142, 0), (32, 1.02, 18849.23),
+         (31, 2.84, 5507.55), (25, 1.32, 5223.69), (18, 1.42, 1577.34), (10, 5.91, 10977.08),
+         (9, 1.42, 6275.96), (9, 0.27, 5486.78)),
+        ((4359, 5.7846, 6283.0758), (124, 5.579, 12566.152), (12, 3.14, 0), (9, 3.63, 77713.77),
+         (6, 1.87, 5573.14), (3, 5.47, 18849.23)),
+        ((145, 4.273, 6283.076), (7, 3.92, 12566.15)),
+        ((4, 2.56, 6283.08),),
+    )
+
+    # (first year, last year, origin, coefficients by power of the years from the origin)
+    DELTA_T_POLYNOMIALS = (
+        (1600, 1700, 1600, (120, -0.9808, -0.01532, 1 / 7129)),
+        (1700, 1800, 1700, (8.83, 0.1603, -0.0059285, 0.00013336, -1 / 1174000)),
+        (1800, 1860, 1800, (13.72, -0.332447, 0.0068612, 0.0041116, -0.00037436, 0.0000121272, -0.0000001699, 0.000000000875)),
+        (1860, 1900, 1860, (7.62, 0.5737, -0.251754, 0.01680668, -0.0004473624, 1 / 233174)),
+        (1900, 1920, 1900, (-2.79, 1.494119, -0.0598939, 0.0061966, -0.000197)),
+        (1920, 1941, 1920, (21.20, 0.84493, -0.076100, 0.0020936)),
+        (1941, 1961, 1950, (29.07, 0.407, -1 / 233, 1 / 2547)),
+        (1961, 1986, 1975, (45.45, 1.067, -1 / 260, -1 / 718)),
+        (1986, 2005, 2000, (63.86, 0.3345, -0.060374, 0.0017275, 0.000651814, 0.00002373599)),
+        (2005, 2050, 2000, (62.92, 0.32217, 0.005589)),
+    )
+
+    def __init__(self, terms: Optional[int] = None):
+        super().__init__()
+        self.terms = terms
+
+    @property
+    def terms(self) -> Optional[int]:
+        return self._terms
+
+    @terms.setter
+    def terms(self, terms: Optional[int]):
+        # the compiled series and the memoized coordinates both depend on the truncation
+        self._terms = terms
+        self._series_arrays = None
+        self._last_coordinates = (None, None)
+
+    def __repr__(self):
+        return "%s(terms=%r)" % (self.__module__ + "." + self.__class__.__qualname__, self.terms)
+
+    @staticmethod
+    def name():
+        return 'Truncated VSOP87 solar theory (Meeus) with the US National Oceanic and Atmospheric Administration Algorithm'
+
+    @classmethod
+    def delta_t(cls, year: float) -> float:
+        # difference between dynamical and universal time in seconds, per the Espenak & Meeus polynomials
+        for first_year, last_year, origin, coefficients in cls.DELTA_T_POLYNOMIALS:
+            if first_year <= year < last_year:
+                t = year - origin
+                return sum(coefficient * (t ** power) for power, coefficient in enumerate(coefficients))
+        u = (year - 1820) / 100.0
+        if 2050 <= year < 2150:
+            return -20 + (32 * u * u) - (0.5628 * (2150 - year))
+        return -20 + (32 * u * u)  # long term parabola
+
+    def _equation_of_time(self, julian_centuries: float) -> float:
+        tau = self._dynamical_millennia(julian_centuries)
+        longitude, latitude, obliquity, nutation = self._apparent_coordinates(tau)
+        return self._equation_of_time_from_coordinates(tau, longitude, latitude, obliquity, nutation)
+
+    def _solar_declination(self, julian_centuries: float) -> float:
+        longitude, latitude, obliquity, _ = self._apparent_coordinates(self._dynamical_millennia(julian_centuries))
+        lambda_r, beta_r, epsilon_r = math.radians(longitude), math.radians(latitude), math.radians(obliquity)
+        sint = (math.sin(beta_r) * math.cos(epsilon_r)) + (math.cos(beta_r) * math.sin(epsilon_r) * math.sin(lambda_r))
+        return math.degrees(math.asin(sint))  # in degrees
+
+    def _sun_apparent_longitude(self, julian_centuries: float) -> float:
+        return self._apparent_coordinates(self._dynamical_millennia(julian_centuries))[0]  # in degrees
+
+    def _dynamical_millennia(self, julian_centuries: float) -> float:
+        year = 2000.0 + (julian_centuries * 100.0)
+        return (julian_centuries / 10.0) + (self.delta_t(year) / (86400.0 * self.JULIAN_DAYS_PER_MILLENNIUM))
+
+    def _apparent_coordinates(self, tau: float) -> Tuple[float, float, float, float]:
+        # the equation of time and declination are requested at the same instant, so the last coordinates are kept
+        last_tau, coordinates = self._last_coordinates
+        if last_tau == tau:
+            return coordinates
+
+        longitude = math.degrees(self._evaluate_series(self.LONGITUDE_SERIES, tau)) + 180.0  # geocentric
+        latitude = -math.degrees(self._evaluate_series(self.LATITUDE_SERIES, tau))
+        radius = self._evaluate_series(self.RADIUS_SERIES, tau)
+        julian_centuries = tau * 10.0
+
+        # conversion to the FK5 system
+        fk5_longitude = math.radians(longitude - (1.397 * julian_centuries) - (0.00031 * julian_centuries * julian_centuries))
+        longitude -= 0.09033 / 3600.0
+        latitude += (0.03916 / 3600.0) * (math.cos(fk5_longitude) - math.sin(fk5_longitude))
+
+        nutation_longitude, nutation_obliquity = self._nutation(julian_centuries)
+        longitude += nutation_longitude - (20.4898 / 3600.0 / radius)  # nutation and aberration
+        obliquity = self._mean_obliquity_of_ecliptic(julian_centuries) + nutation_obliquity
+
+        coordinates = (longitude % 360, latitude, obliquity, nutation_longitude)  # in degrees
+        self._last_coordinates = (tau, coordinates)
+        return coordinates
+
+    def _evaluate_series(self, series: tuple, tau: float) -> float:
+        value = 0.0
+        for power, terms in enumerate(series):
+            value += sum(amplitude * math.cos(phase + (frequency * tau)) for amplitude, phase, frequency in terms[:self.terms]) * (tau ** power)
+        return value / 1e8
+
+    def _nutation(self, julian_centuries: float) -> Tuple[float, float]:
+        omega = math.radians(125.04452 - (1934.136261 * julian_centuries))
+        sun_longitude = math.radians(280.4665 + (36000.7698 * julian_centuries))
+        moon_longitude = math.radians(218.3165 + (481267.8813 * julian_centuries))
+        longitude = (-17.20 * math.sin(omega)) - (1.32 * math.sin(2 * sun_longitude)) - \
+                    (0.23 * math.sin(2 * moon_longitude)) + (0.21 * math.sin(2 * omega))
+        obliquity = (9.20 * math.cos(omega)) + (0.57 * math.cos(2 * sun_longitude)) + \
+                    (0.10 * math.cos(2 * moon_longitude)) - (0.09 * math.cos(2 * omega))
+        return longitude / 3600.0, obliquity / 3600.0  # in degrees
+
+    def _equation_of_time_from_coordinates(self, tau: float, longitude: float, latitude: float, obliquity: float, nutation: float) -> float:
+        mean_longitude = 280.4664567 + (360007.6982779 * tau) + (0.03032028 * tau * tau) + ((tau ** 3) / 49931) - \
+                         ((tau ** 4) / 15300) - ((tau ** 5) / 2000000)
+        lambda_r, beta_r, epsilon_r = math.radians(longitude), math.radians(latitude), math.radians(obliquity)
+        right_ascension = math.degrees(math.atan2((math.sin(lambda_r) * math.cos(epsilon_r)) - (math.tan(beta_r) * math.sin(epsilon_r)),
+                                                  math.cos(lambda_r)))
+        eq_time = mean_longitude - 0.0057183 - right_ascension + (nutation * math.cos(epsilon_r))
+        return (((eq_time + 180.0) % 360.0) - 180.0) * 4.0  # minutes of time
+
+    def _equation_of_time_array(self, julian_centuries):
+        import numpy as np
+
+        tau = self._dynamical_millennia_array(julian_centuries)
+        longitude, latitude, obliquity, nutation = self._apparent_coordinates_array(tau)
+        mean_longitude = 280.4664567 + (360007.6982779 * tau) + (0.03032028 * tau * tau) + ((tau ** 3) / 49931) - \
+            ((tau ** 4) / 15300) - ((tau ** 5) / 2000000)
+        lambda_r, beta_r, epsilon_r = np.radians(longitude), np.radians(latitude), np.radians(obliquity)
+        right_ascension = np.degrees(np.arctan2((np.sin(lambda_r) * np.cos(epsilon_r)) - (np.tan(beta_r) * np.sin(epsilon_r)),
+                                                np.cos(lambda_r)))
+        eq_time = mean_longitude - 0.0057183 - right_ascension + (nutation * np.cos(epsilon_r))
+        return (((eq_time + 180.0) % 360.0) - 180.0) * 4.0  # minutes of time
+
+    def _solar_declination_array(self, julian_centuries):
+        import numpy as np
+
+        longitude, latitude, obliquity, _ = self._apparent_coordinates_array(self._dynamical_millennia_array(julian_centuries))
+        lambda_r, beta_r, epsilon_r = np.radians(longitude), np.radians(latitude), np.radians(obliquity)
+        sint = (np.sin(beta_r) * np.cos(epsilon_r)) + (np.cos(beta_r) * np.sin(epsilon_r) * np.sin(lambda_r))
+        return np.degrees(np.arcsin(sint))  # in degrees
+
+    def _sun_apparent_longitude_array(self, julian_centuries):
+        return self._apparent_coordinates_array(self._dynamical_millennia_array(julian_centuries))[0]  # in degrees
+
+    def _dynamical_millennia_array(self, julian_centuries):
+        import numpy as np
+
+        julian_centuries = np.asarray(julian_centuries, dtype=np.float64)
+        years = 2000.0 + (julian_centuries * 100.0)
+        delta_t = self._delta_t_array(years)
+        return (julian_centuries / 10.0) + (delta_t / (86400.0 * self.JULIAN_DAYS_PER_MILLENNIUM))
+
+    def _delta_t_array(self, years):
+        import numpy as np
+
+        u = (years - 1820) / 100.0
+        delta_t = np.where((2050 <= years) & (years < 2150), -20 + (32 * u * u) - (0.5628 * (2150 - years)), -20 + (32 * u * u))
+        for first_year, last_year, origin, coefficients in self.DELTA_T_POLYNOMIALS:
+            in_range = (first_year <= years) & (years < last_year)
+            delta_t = np.where(in_range, np.polynomial.polynomial.polyval(years - origin, coefficients), delta_t)
+        return delta_t  # in seconds
+
+    def _apparent_coordinates_array(self, tau):
+        import numpy as np
+
+        longitude_series, latitude_series, radius_series = self._series_arrays or self._compile_series_arrays()
+        longitude = np.degrees(self._evaluate_series_array(longitude_series, tau)) + 180.0  # geocentric
+        latitude = -np.degrees(self._evaluate_series_array(latitude_series, tau))
+        radius = self._evaluate_series_array(radius_series, tau)
+        julian_centuries = tau * 10.0
+
+        # conversion to the FK5 system
+        fk5_longitude = np.radians(longitude - (1.397 * julian_centuries) - (0.00031 * julian_centuries * julian_centuries))
+        longitude = longitude - (0.09033 / 3600.0)
+        latitude = latitude + ((0.03916 / 3600.0) * (np.cos(fk5_longitude) - np.sin(fk5_longitude)))
+
+        nutation_longitude, nutation_obliquity = self._nutation_array(julian_centuries)
+        longitude = longitude + nutation_longitude - (20.4898 / 3600.0 / radius)  # nutation and aberration
+        obliquity = self._mean_obliquity_of_ecliptic(julian_centuries) + nutation_obliquity
+        return longitude % 360, latitude, obliquity, nutation_longitude  # in degrees
+
+    def _evaluate_series_array(self, series: list, tau):
+        import numpy as np
+
+        tau = np.asarray(tau, dtype=np.float64)
+        value = np.zeros_like(tau)
+        for power, (amplitudes, phases, frequencies) in enumerate(series):
+            terms = amplitudes * np.cos(phases + (frequencies * tau[..., np.newaxis]))
+            value += terms.sum(axis=-1) * (tau ** power)
+        return value / 1e8
+
+    def _compile_series_arrays(self) -> tuple:
+        import numpy as np
+
+        self._series_arrays = tuple([tuple(np.array(column, dtype=np.float64) for column in zip(*terms[:self.terms])) for terms in series]
+                                    for series in (self.LONGITUDE_SERIES, self.LATITUDE_SERIES, self.RADIUS_SERIES))
+        return self._series_arrays
+
+    def _nutation_array(self, julian_centuries):
+        import numpy as np
+
+        omega = np.radians(125.04452 - (1934.136261 * julian_centuries))
+        sun_longitude = np.radians(280.4665 + (36000.7698 * julian_centuries))
+        moon_longitude = np.radians(218.3165 + (481267.8813 * julian_centuries))
+        longitude = (-17.20 * np.sin(omega)) - (1.32 * np.sin(2 * sun_longitude)) - \
+                    (0.23 * np.sin(2 * moon_longitude)) + (0.21 * np.sin(2 * omega))
+        obliquity = (9.20 * np.cos(omega)) + (0.57 * np.cos(2 * sun_longitude)) + \
+                    (0.10 * np.cos(2 * moon_longitude)) - (0.09 * np.cos(2 * omega))
+        return longitude / 3600.0, obliquity / 3600.0  # in degrees
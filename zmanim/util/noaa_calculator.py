@@ -1,32 +1,226 @@
 import math
-from datetime import date, datetime, time
-from typing import Optional
-
-import julian
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from zmanim.util.astronomical_calculations import AstronomicalCalculations
 from zmanim.util.geo_location import GeoLocation
+from zmanim.util.horizon_profile import HorizonProfile
 
 
 class NOAACalculator(AstronomicalCalculations):
     JULIAN_DAY_JAN_1_2000 = 2451545.0
     JULIAN_DAYS_PER_CENTURY = 36525.0
+    JULIAN_DAY_UNIX_EPOCH = 2440587.5
+    JULIAN_DAY_NUMBER_ORDINAL_OFFSET = 1721425  # julian day number of the proleptic gregorian ordinal 0
+
+    PRECISION_PASSES = {'fast': 1, 'standard': 2, 'converged': 12}
+    CONVERGENCE_TOLERANCE = 0.0001  # minutes
+
+    SEASONS = ('march_equinox', 'june_solstice', 'september_equinox', 'december_solstice')
+    MEAN_TROPICAL_YEAR = 365.2422  # days
+    SEASON_TOLERANCE = 1e-8  # days
+
+    # stepping skips the first pass when the estimated deviation from the two-pass result is within this bound
+    STEP_TOLERANCE = 1.0  # seconds
+    MAX_SOLAR_DECLINATION_RATE = 0.4 / 1440.0  # degrees per minute, reached near the equinoxes
+    MAX_EQUATION_OF_TIME_RATE = 0.5 / 1440.0  # minutes of time per minute
 
     @staticmethod
     def name():
         return 'US National Oceanic and Atmospheric Administration Algorithm'
 
     def utc_sunrise(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False) -> Optional[float]:
-        try:
-            return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunrise')
-        except ValueError:
-            return None
+        return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunrise')
 
     def utc_sunset(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False) -> Optional[float]:
-        try:
-            return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunset')
-        except ValueError:
-            return None
+        return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunset')
+
+    def sun_event_type(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False, mode: str = 'sunrise'):
+        julian_day = self.julian_day(target_date)
+        elevation = geo_location.elevation if adjust_for_elevation else 0.0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        latitude, longitude = geo_location.latitude, -geo_location.longitude
+
+        # the first pass checks the declination at solar noon, the refinement at the approximate event time
+        noonmin = self._solar_noon_utc(self._julian_centuries_from_julian_day(julian_day), longitude)
+        approx_julian_centuries = self._julian_centuries_from_julian_day(julian_day + (noonmin / 1440.0))
+        first_pass = self._approximate_utc_sun_position(approx_julian_centuries, latitude, longitude, adjusted_zenith, mode)
+        if first_pass is not None:
+            approx_julian_centuries = self._julian_centuries_from_julian_day(julian_day + (first_pass / 1440.0))
+        solar_dec = self._solar_declination(approx_julian_centuries)
+        return self._sun_event(self._cos_sun_hour_angle(latitude, solar_dec, adjusted_zenith))
+
+    def utc_solar_noon(self, target_date: date, geo_location: GeoLocation) -> float:
+        julian_centuries = self._julian_centuries_from_julian_day(self.julian_day(target_date))
+        return (self._solar_noon_utc(julian_centuries, -geo_location.longitude) / 60.0) % 24  # normalized (0...24)
+
+    def utc_solar_midnight(self, target_date: date, geo_location: GeoLocation) -> float:
+        julian_centuries = self._julian_centuries_from_julian_day(self.julian_day(target_date))
+        # transit of the anti-meridian, following solar noon
+        return (self._solar_noon_utc(julian_centuries, 180 - geo_location.longitude) / 60.0) % 24  # normalized (0...24)
+
+    def utc_sunrise_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False):
+        return self._utc_sun_position_batch(target_dates, geo_location, zenith, adjust_for_elevation, 'sunrise')
+
+    def utc_solar_noon_batch(self, target_dates: Iterable[date], geo_location: GeoLocation):
+        return self._utc_sun_transit_batch(target_dates, -geo_location.longitude)
+
+    def utc_solar_midnight_batch(self, target_dates: Iterable[date], geo_location: GeoLocation):
+        return self._utc_sun_transit_batch(target_dates, 180 - geo_location.longitude)
+
+    def utc_sunset_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False):
+        return self._utc_sun_position_batch(target_dates, geo_location, zenith, adjust_for_elevation, 'sunset')
+
+    def sun_event_type_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False,
+                             mode: str = 'sunrise'):
+        import numpy as np
+
+        julian_days = np.asarray(target_dates, dtype='datetime64[D]').astype(np.int64) + self.JULIAN_DAY_UNIX_EPOCH
+        elevation = geo_location.elevation if adjust_for_elevation else 0.0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        latitude, longitude = geo_location.latitude, -geo_location.longitude
+
+        noonmin = self._solar_noon_utc_array(self._julian_centuries_from_julian_day(julian_days), longitude)
+        tnoon = self._julian_centuries_from_julian_day(julian_days + (noonmin / 1440.0))
+        first_pass = self._approximate_utc_sun_position_array(tnoon, latitude, longitude, adjusted_zenith, mode)
+        approx_julian_centuries = np.where(np.isnan(first_pass), tnoon, self._julian_centuries_from_julian_day(julian_days + (first_pass / 1440.0)))
+        solar_dec = self._solar_declination_array(approx_julian_centuries)
+        return self._sun_event_array(self._cos_sun_hour_angle_array(latitude, solar_dec, adjusted_zenith))
+
+    def utc_sunrise_grid(self, target_date: date, latitudes, longitudes, zenith: float, elevation: float = 0.0):
+        return self._utc_sun_position_grid(target_date, latitudes, longitudes, zenith, elevation, 'sunrise')
+
+    def utc_sunset_grid(self, target_date: date, latitudes, longitudes, zenith: float, elevation: float = 0.0):
+        return self._utc_sun_position_grid(target_date, latitudes, longitudes, zenith, elevation, 'sunset')
+
+    def utc_candle_lighting_grid(self, target_date: date, latitudes, longitudes, candle_lighting_offset: float):
+        # sea level sunset less the offset in minutes, matching ZmanimCalendar.candle_lighting()
+        sunset = self._utc_sun_position_grid(target_date, latitudes, longitudes, self.GEOMETRIC_ZENITH, 0.0, 'sunset')
+        return (sunset - (candle_lighting_offset / 60.0)) % 24
+
+    def utc_sun_positions(self, target_date: date, geo_location: GeoLocation, zeniths: Iterable[float], adjust_for_elevation: bool = False,
+                          modes: Iterable[str] = ('sunrise', 'sunset')) -> dict:
+        julian_day = self.julian_day(target_date)
+        elevation = geo_location.elevation if adjust_for_elevation else 0.0
+        latitude, longitude = geo_location.latitude, -geo_location.longitude
+
+        # solar noon and the ephemeris at noon are shared by the first pass of every zenith
+        julian_centuries = self._julian_centuries_from_julian_day(julian_day)
+        noonmin = self._solar_noon_utc(julian_centuries, longitude)
+        tnoon = self._julian_centuries_from_julian_day(julian_day + (noonmin / 1440.0))
+        eq_time = self._equation_of_time(tnoon)
+        solar_dec = self._solar_declination(tnoon)
+
+        results = {}
+        for zenith in zeniths:
+            adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+            for mode in modes:
+                utc_time = self._utc_sun_position_from_ephemeris(eq_time, solar_dec, latitude, longitude, adjusted_zenith, mode)
+                if utc_time is not None:
+                    trefinement = self._julian_centuries_from_julian_day(julian_day + (utc_time / 1440.0))
+                    utc_time = self._approximate_utc_sun_position(trefinement, latitude, longitude, adjusted_zenith, mode)
+                results[(zenith, mode)] = None if utc_time is None else (utc_time / 60.0) % 24
+        return results
+
+    def utc_sun_position_solve(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False,
+                               mode: str = 'sunrise', precision: str = 'standard', apparent: bool = True) -> Tuple[Optional[float], int]:
+        self._validate_precision(precision)
+        elevation = geo_location.elevation if adjust_for_elevation else 0.0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation) if apparent else zenith
+        utc_time, iterations = self._solve_utc_sun_position(self.julian_day(target_date),
+                                                            geo_location.latitude,
+                                                            -geo_location.longitude,
+                                                            adjusted_zenith,
+                                                            mode,
+                                                            self.PRECISION_PASSES[precision])  # in minutes
+        return (None if utc_time is None else (utc_time / 60.0) % 24), iterations
+
+    def solar_position(self, instant: datetime, geo_location: GeoLocation) -> Tuple[float, float]:
+        if instant.tzinfo is not None:
+            instant = instant.astimezone(timezone.utc).replace(tzinfo=None)
+        julian_centuries = self._julian_centuries_from_julian_day(self.julian_day(instant))
+        eq_time = self._equation_of_time(julian_centuries)
+        solar_dec = self._solar_declination(julian_centuries)
+        utc_minutes = (instant.hour * 60) + instant.minute + (instant.second / 60.0) + (instant.microsecond / 60000000.0)
+        hour_angle = self._local_hour_angle(utc_minutes, eq_time, geo_location.longitude)
+        return self._sun_elevation_azimuth(geo_location.latitude, solar_dec, hour_angle)
+
+    def solar_position_batch(self, instants, geo_location: GeoLocation):
+        import numpy as np
+
+        microseconds = self._utc_instants_array(instants).astype(np.int64)
+        julian_days = (microseconds / 86400000000.0) + self.JULIAN_DAY_UNIX_EPOCH
+        julian_centuries = self._julian_centuries_from_julian_day(julian_days)
+        eq_time = self._equation_of_time_array(julian_centuries)
+        solar_dec = self._solar_declination_array(julian_centuries)
+        utc_minutes = (microseconds % 86400000000) / 60000000.0
+        hour_angle = self._local_hour_angle(utc_minutes, eq_time, geo_location.longitude)
+        return self._sun_elevation_azimuth_array(geo_location.latitude, solar_dec, hour_angle)
+
+    def utc_sun_position_steps(self, start_date: date, end_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False,
+                               mode: str = 'sunrise') -> Iterator[Tuple[date, Optional[float]]]:
+        elevation = geo_location.elevation if adjust_for_elevation else 0.0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        latitude, longitude = geo_location.latitude, -geo_location.longitude
+
+        previous = step = None  # converged event time of the previous day (in minutes) and its change from the day before
+        for offset in range((end_date - start_date).days + 1):
+            target_date = start_date + timedelta(days=offset)
+            julian_day = self.julian_day(target_date)
+            utc_time = None
+            if previous is not None and step is not None:
+                # the previous day's event is close enough to today's that it can stand in for the first pass
+                tseed = self._julian_centuries_from_julian_day(julian_day + (previous / 1440.0))
+                solar_dec = self._solar_declination(tseed)
+                if self._seeded_step_deviation(latitude, solar_dec, adjusted_zenith, step) <= self.STEP_TOLERANCE:
+                    utc_time = self._approximate_utc_sun_position(tseed, latitude, longitude, adjusted_zenith, mode)
+            if utc_time is None:
+                utc_time = self._calculate_utc_sun_position(julian_day, latitude, longitude, adjusted_zenith, mode)
+
+            step = None if utc_time is None or previous is None else abs(utc_time - previous)
+            previous = utc_time
+            yield target_date, None if utc_time is None else (utc_time / 60.0) % 24
+
+    def equinoxes_and_solstices(self, first_year: int, last_year: Optional[int] = None) -> List[Tuple[str, datetime]]:
+        results = []
+        for year in range(first_year, (first_year if last_year is None else last_year) + 1):
+            for index, season in enumerate(self.SEASONS):
+                # equinoxes are where the declination crosses zero and solstices where it peaks,
+                # at apparent longitudes of 0, 90, 180 and 270 degrees
+                estimate = self.julian_day(date(year, (index * 3) + 3, 21))
+                julian_day = self._apparent_longitude_crossing(index * 90.0, estimate)
+                results.append((season, self._utc_date_time_from_julian_day(julian_day)))
+        return results
+
+    @classmethod
+    def julian_day(cls, target_date: date) -> float:
+        julian_day_number = target_date.toordinal() + cls.JULIAN_DAY_NUMBER_ORDINAL_OFFSET
+        if not isinstance(target_date, datetime):
+            return julian_day_number - 0.5  # midnight
+        return julian_day_number + ((target_date.hour - 12) / 24) + (target_date.minute / 1440) + \
+            (target_date.second / 86400) + (target_date.microsecond / 86400000000)
+
+    def _apparent_longitude_crossing(self, longitude: float, julian_day: float) -> float:
+        def offset(day: float) -> float:  # in degrees, wrapped to (-180...180]
+            apparent_longitude = self._sun_apparent_longitude(self._julian_centuries_from_julian_day(day))
+            return ((apparent_longitude - longitude + 180.0) % 360.0) - 180.0
+
+        # secant method, seeded by a step at the mean rate of the sun's motion
+        previous_day, previous_offset = julian_day, offset(julian_day)
+        julian_day -= previous_offset * self.MEAN_TROPICAL_YEAR / 360.0
+        for _ in range(20):
+            current_offset = offset(julian_day)
+            if current_offset == previous_offset:
+                break
+            step = current_offset * (julian_day - previous_day) / (current_offset - previous_offset)
+            previous_day, previous_offset = julian_day, current_offset
+            julian_day -= step
+            if abs(step) < self.SEASON_TOLERANCE:
+                break
+        return julian_day
+
+    def _utc_date_time_from_julian_day(self, julian_day: float) -> datetime:
+        return datetime(2000, 1, 1, 12, tzinfo=timezone.utc) + timedelta(days=julian_day - self.JULIAN_DAY_JAN_1_2000)
 
     def _julian_centuries_from_julian_day(self, julian_day: float) -> float:
         return (julian_day - self.JULIAN_DAY_JAN_1_2000) / self.JULIAN_DAYS_PER_CENTURY
@@ -34,54 +228,137 @@ class NOAACalculator(AstronomicalCalculations):
     def _julian_day_from_julian_centuries(self, julian_centuries: float) -> float:
         return (julian_centuries * self.JULIAN_DAYS_PER_CENTURY) + self.JULIAN_DAY_JAN_1_2000
 
-    def _utc_sun_position(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool, mode: str) -> float:
-        if not isinstance(target_date, datetime):
-            target_date = datetime.combine(target_date, time())
+    def _utc_sun_position(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool, mode: str) -> Optional[float]:
         elevation = geo_location.elevation if adjust_for_elevation else 0.0
         adjusted_zenith = self.adjusted_zenith(zenith, elevation)
-        utc_time = self._calculate_utc_sun_position(julian.to_jd(target_date),
+        utc_time = self._calculate_utc_sun_position(self.julian_day(target_date),
                                                     geo_location.latitude,
                                                     -geo_location.longitude,
                                                     adjusted_zenith,
                                                     mode)  # in minutes
+        if utc_time is None:
+            return None
         utc_time /= 60.0  # in hours
         return utc_time % 24  # normalized (0...24)
 
-    def _calculate_utc_sun_position(self, julian_day: float, latitude: float, longitude: float, zenith: float, mode: str) -> float:
+    def _calculate_utc_sun_position(self, julian_day: float, latitude: float, longitude: float, zenith: float, mode: str) -> Optional[float]:
         julian_centuries = self._julian_centuries_from_julian_day(julian_day)
 
         # first pass using solar noon
         noonmin = self._solar_noon_utc(julian_centuries, longitude)
         tnoon = self._julian_centuries_from_julian_day(julian_day + (noonmin / 1440.0))
         first_pass = self._approximate_utc_sun_position(tnoon, latitude, longitude, zenith, mode)
+        if first_pass is None:
+            return None
 
         # refine using output of first pass
         trefinement = self._julian_centuries_from_julian_day(julian_day + (first_pass / 1440.0))
         return self._approximate_utc_sun_position(trefinement, latitude, longitude, zenith, mode)
 
-    def _approximate_utc_sun_position(self, approx_julian_centuries: float, latitude: float, longitude: float, zenith: float, mode: str) -> float:
+    def _utc_visible_sun_position(self, target_date: date, geo_location: GeoLocation, horizon_profile: HorizonProfile, mode: str) -> Optional[float]:
+        julian_day = self.julian_day(target_date)
+        latitude, longitude = geo_location.latitude, -geo_location.longitude
+        direction = 1 if mode == 'sunrise' else -1  # sunset is searched backwards, towards solar noon
+
+        # the sun cannot clear the horizon before it reaches the lowest point of the profile
+        start = self._calculate_utc_sun_position(julian_day, latitude, longitude, self._horizon_zenith(horizon_profile, geo_location.elevation), mode)
+        if start is None:
+            return None
+        noonmin = self._solar_noon_utc(self._julian_centuries_from_julian_day(julian_day), longitude)
+
+        def clearance(minutes: float) -> float:
+            julian_centuries = self._julian_centuries_from_julian_day(julian_day + (minutes / 1440.0))
+            hour_angle = self._local_hour_angle(minutes, self._equation_of_time(julian_centuries), geo_location.longitude)
+            elevation, azimuth = self._sun_elevation_azimuth(latitude, self._solar_declination(julian_centuries), hour_angle)
+            upper_limb = elevation + self.solar_radius
+            return upper_limb + self.refraction_model.refraction(upper_limb, geo_location.elevation) - horizon_profile.elevation_at(azimuth)
+
+        hidden = start - (direction * self.HORIZON_SCAN_STEP)
+        visible = start
+        while clearance(visible) < 0:
+            hidden, visible = visible, visible + (direction * self.HORIZON_SCAN_STEP)
+            if direction * (visible - noonmin) > 0:
+                return None  # the sun stays behind the horizon profile
+        for _ in range(self.HORIZON_BISECTIONS):
+            middle = (hidden + visible) / 2.0
+            if clearance(middle) < 0:
+                hidden = middle
+            else:
+                visible = middle
+        return (visible / 60.0) % 24  # normalized (0...24)
+
+    def _solve_utc_sun_position(self, julian_day: float, latitude: float, longitude: float, zenith: float, mode: str,
+                                passes: int) -> Tuple[Optional[float], int]:
+        julian_centuries = self._julian_centuries_from_julian_day(julian_day)
+
+        # first pass using solar noon
+        noonmin = self._solar_noon_utc(julian_centuries, longitude)
+        tnoon = self._julian_centuries_from_julian_day(julian_day + (noonmin / 1440.0))
+        utc_time = self._approximate_utc_sun_position(tnoon, latitude, longitude, zenith, mode)
+
+        # each further pass refines using the output of the previous one, until the event time stops moving
+        iterations = 1
+        while utc_time is not None and iterations < passes:
+            trefinement = self._julian_centuries_from_julian_day(julian_day + (utc_time / 1440.0))
+            refined = self._approximate_utc_sun_position(trefinement, latitude, longitude, zenith, mode)
+            converged = refined is not None and abs(refined - utc_time) < self.CONVERGENCE_TOLERANCE
+            utc_time, iterations = refined, iterations + 1
+            if converged:
+                break
+        return utc_time, iterations
+
+    def _approximate_utc_sun_position(self, approx_julian_centuries: float, latitude: float, longitude: float, zenith: float, mode: str) -> Optional[float]:
         eq_time = self._equation_of_time(approx_julian_centuries)
         solar_dec = self._solar_declination(approx_julian_centuries)
+        return self._utc_sun_position_from_ephemeris(eq_time, solar_dec, latitude, longitude, zenith, mode)
+
+    def _utc_sun_position_from_ephemeris(self, eq_time: float, solar_dec: float, latitude: float, longitude: float, zenith: float, mode: str) -> Optional[float]:
         hour_angle = self._sun_hour_angle_at_horizon(latitude, solar_dec, zenith, mode)
+        if hour_angle is None:
+            return None
 
         delta = longitude - math.degrees(hour_angle)
         time_delta = delta * 4.0
         return 720 + time_delta - eq_time
 
-    def _sun_hour_angle_at_horizon(self, latitude: float, solar_dec: float, zenith: float, mode: str) -> float:
+    def _sun_hour_angle_at_horizon(self, latitude: float, solar_dec: float, zenith: float, mode: str) -> Optional[float]:
+        cos_hour_angle = self._cos_sun_hour_angle(latitude, solar_dec, zenith)
+        if not -1 <= cos_hour_angle <= 1:
+            return None  # the sun does not reach the zenith on this day
+        hour_angle = math.acos(cos_hour_angle)
+
+        if mode == 'sunset':
+            hour_angle *= -1
+
+        return hour_angle  # in radians
+
+    def _local_hour_angle(self, utc_minutes, eq_time, longitude: float):
+        true_solar_time = utc_minutes + eq_time + (longitude * 4.0)  # in minutes
+        return (true_solar_time / 4.0) - 180.0  # in degrees, negative before solar noon
+
+    def _seeded_step_deviation(self, latitude: float, solar_dec: float, zenith: float, step: float) -> float:
+        cos_hour_angle = self._cos_sun_hour_angle(latitude, solar_dec, zenith)
+        if not -1 < cos_hour_angle < 1:
+            return math.inf
+
+        # bound how quickly the event time drifts with the instant the ephemeris is evaluated at
         lat_r = math.radians(latitude)
         solar_dec_r = math.radians(solar_dec)
         zenith_r = math.radians(zenith)
+        cos_hour_angle_rate = ((math.cos(zenith_r) * math.sin(solar_dec_r)) - math.sin(lat_r)) / (math.cos(lat_r) * math.cos(solar_dec_r) ** 2)
+        hour_angle_rate = abs(cos_hour_angle_rate) / math.sqrt(1 - (cos_hour_angle * cos_hour_angle))  # degrees per degree of declination
+        drift = (4.0 * hour_angle_rate * self.MAX_SOLAR_DECLINATION_RATE) + self.MAX_EQUATION_OF_TIME_RATE  # minutes per minute
 
-        hour_angle = math.acos(
-            (math.cos(zenith_r) / (math.cos(lat_r) * math.cos(solar_dec_r))) -
-            (math.tan(lat_r) * math.tan(solar_dec_r))
-        )
+        # the first pass is evaluated at solar noon, at most half a day from the event, while the seed is a day's step away
+        return drift * ((drift * 720.0) + step) * 60.0  # in seconds
 
-        if mode == 'sunset':
-            hour_angle *= -1
+    def _cos_sun_hour_angle(self, latitude: float, solar_dec: float, zenith: float) -> float:
+        lat_r = math.radians(latitude)
+        solar_dec_r = math.radians(solar_dec)
+        zenith_r = math.radians(zenith)
 
-        return hour_angle  # in radians
+        return (math.cos(zenith_r) / (math.cos(lat_r) * math.cos(solar_dec_r))) - \
+               (math.tan(lat_r) * math.tan(solar_dec_r))
 
     def _solar_declination(self, julian_centuries: float) -> float:
         correction = math.radians(self._obliquity_correction(julian_centuries))
@@ -165,3 +442,230 @@ class NOAACalculator(AstronomicalCalculations):
         seconds = 21.448 - (
                     julian_centuries * (46.8150 + (julian_centuries * (0.00059 - (julian_centuries * 0.001813)))))
         return 23.0 + ((26.0 + (seconds / 60)) / 60.0)  # in degrees
+
+    def _utc_sun_position_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool, mode: str):
+        import numpy as np
+
+        days = np.asarray(target_dates, dtype='datetime64[D]').astype(np.int64)
+        julian_days = days + self.JULIAN_DAY_UNIX_EPOCH
+        elevation = geo_location.elevation if adjust_for_elevation else 0.0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        utc_time = self._calculate_utc_sun_position_array(julian_days,
+                                                          geo_location.latitude,
+                                                          -geo_location.longitude,
+                                                          adjusted_zenith,
+                                                          mode)  # in minutes
+        utc_time /= 60.0  # in hours
+        return utc_time % 24  # normalized (0...24), NaN where the sun does not reach the zenith
+
+    def _utc_sun_transit_batch(self, target_dates: Iterable[date], longitude: float):
+        import numpy as np
+
+        julian_days = np.asarray(target_dates, dtype='datetime64[D]').astype(np.int64) + self.JULIAN_DAY_UNIX_EPOCH
+        julian_centuries = self._julian_centuries_from_julian_day(julian_days)
+        return (self._solar_noon_utc_array(julian_centuries, longitude) / 60.0) % 24  # normalized (0...24)
+
+    def _utc_visible_sun_position_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, horizon_profile: HorizonProfile, mode: str):
+        import numpy as np
+
+        julian_days = np.asarray(target_dates, dtype='datetime64[D]').astype(np.int64) + self.JULIAN_DAY_UNIX_EPOCH
+        latitude, longitude = geo_location.latitude, -geo_location.longitude
+        direction = 1 if mode == 'sunrise' else -1  # sunset is searched backwards, towards solar noon
+
+        def clearance(index, minutes):
+            julian_centuries = self._julian_centuries_from_julian_day(julian_days[index] + (minutes / 1440.0))
+            hour_angle = self._local_hour_angle(minutes, self._equation_of_time_array(julian_centuries), geo_location.longitude)
+            elevation, azimuth = self._sun_elevation_azimuth_array(latitude, self._solar_declination_array(julian_centuries), hour_angle)
+            upper_limb = elevation + self.solar_radius
+            return upper_limb + self.refraction_model.refraction_array(upper_limb, geo_location.elevation) - horizon_profile.elevation_at_array(azimuth)
+
+        # the sun cannot clear the horizon before it reaches the lowest point of the profile
+        visible = self._calculate_utc_sun_position_array(julian_days, latitude, longitude, self._horizon_zenith(horizon_profile, geo_location.elevation), mode)
+        hidden = visible - (direction * self.HORIZON_SCAN_STEP)
+        noonmin = self._solar_noon_utc_array(self._julian_centuries_from_julian_day(julian_days), longitude)
+        found = np.zeros(julian_days.shape, dtype=bool)
+        searching = np.flatnonzero(~np.isnan(visible))
+        while searching.size:
+            cleared = clearance(searching, visible[searching]) >= 0
+            found[searching[cleared]] = True
+            searching = searching[~cleared]
+            hidden[searching] = visible[searching]
+            visible[searching] += direction * self.HORIZON_SCAN_STEP
+            searching = searching[direction * (visible[searching] - noonmin[searching]) <= 0]  # the sun stays behind the horizon profile
+
+        index = np.flatnonzero(found)
+        for _ in range(self.HORIZON_BISECTIONS):
+            middle = (hidden[index] + visible[index]) / 2.0
+            behind = clearance(index, middle) < 0
+            hidden[index] = np.where(behind, middle, hidden[index])
+            visible[index] = np.where(behind, visible[index], middle)
+
+        utc_time = np.where(found, visible, np.nan) / 60.0  # in hours
+        return utc_time % 24  # normalized (0...24), NaN where the sun does not clear the horizon profile
+
+    def _utc_sun_position_grid(self, target_date: date, latitudes, longitudes, zenith: float, elevation: float, mode: str):
+        import numpy as np
+
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if latitudes.ndim == 1 and longitudes.ndim == 1:
+            # rows by latitude, columns by longitude; the noon pass is only evaluated once per longitude
+            latitudes, longitudes = latitudes[:, np.newaxis], longitudes[np.newaxis, :]
+        elif latitudes.shape != longitudes.shape:
+            raise ValueError("latitudes and longitudes must both be vectors or share the same grid shape")
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        utc_time = self._calculate_utc_sun_position_array(np.float64(self.julian_day(target_date)),
+                                                          latitudes,
+                                                          -longitudes,
+                                                          adjusted_zenith,
+                                                          mode)  # in minutes
+        utc_time = np.broadcast_to(utc_time, np.broadcast_shapes(latitudes.shape, longitudes.shape)) / 60.0  # in hours
+        return np.ma.masked_invalid(utc_time % 24)  # normalized (0...24), masked where the sun does not reach the zenith
+
+    def _calculate_utc_sun_position_array(self, julian_days, latitude, longitude, zenith: float, mode: str):
+        julian_centuries = self._julian_centuries_from_julian_day(julian_days)
+
+        # first pass using solar noon
+        noonmin = self._solar_noon_utc_array(julian_centuries, longitude)
+        tnoon = self._julian_centuries_from_julian_day(julian_days + (noonmin / 1440.0))
+        first_pass = self._approximate_utc_sun_position_array(tnoon, latitude, longitude, zenith, mode)
+
+        # refine using output of first pass
+        trefinement = self._julian_centuries_from_julian_day(julian_days + (first_pass / 1440.0))
+        return self._approximate_utc_sun_position_array(trefinement, latitude, longitude, zenith, mode)
+
+    def _approximate_utc_sun_position_array(self, approx_julian_centuries, latitude, longitude, zenith: float, mode: str):
+        import numpy as np
+
+        eq_time = self._equation_of_time_array(approx_julian_centuries)
+        solar_dec = self._solar_declination_array(approx_julian_centuries)
+        hour_angle = self._sun_hour_angle_at_horizon_array(latitude, solar_dec, zenith, mode)
+
+        delta = longitude - np.degrees(hour_angle)
+        time_delta = delta * 4.0
+        return 720 + time_delta - eq_time
+
+    def _sun_hour_angle_at_horizon_array(self, latitude, solar_dec, zenith: float, mode: str):
+        import numpy as np
+
+        cos_hour_angle = self._cos_sun_hour_angle_array(latitude, solar_dec, zenith)
+        # NaN where the sun does not reach the zenith on this day
+        hour_angle = np.arccos(np.where(np.abs(cos_hour_angle) <= 1, cos_hour_angle, np.nan))
+
+        if mode == 'sunset':
+            hour_angle *= -1
+
+        return hour_angle  # in radians
+
+    def _sun_elevation_azimuth_array(self, latitude, solar_dec, hour_angle):
+        import numpy as np
+
+        lat_r = np.radians(latitude)
+        solar_dec_r = np.radians(solar_dec)
+        hour_angle_r = np.radians(hour_angle)
+
+        cos_zenith = (np.sin(lat_r) * np.sin(solar_dec_r)) + (np.cos(lat_r) * np.cos(solar_dec_r) * np.cos(hour_angle_r))
+        elevation = 90.0 - np.degrees(np.arccos(np.clip(cos_zenith, -1.0, 1.0)))
+        azimuth = np.degrees(np.arctan2(np.sin(hour_angle_r),
+                                        (np.cos(hour_angle_r) * np.sin(lat_r)) - (np.tan(solar_dec_r) * np.cos(lat_r))))
+        return elevation, (azimuth + 180.0) % 360  # in degrees, azimuth clockwise from north
+
+    def _utc_instants_array(self, instants):
+        import numpy as np
+
+        if isinstance(instants, np.ndarray) and np.issubdtype(instants.dtype, np.datetime64):
+            return instants.astype('datetime64[us]')  # numpy datetimes are already in UTC
+        return np.array([instant if instant.tzinfo is None else instant.astimezone(timezone.utc).replace(tzinfo=None)
+                         for instant in instants], dtype='datetime64[us]')
+
+    def _cos_sun_hour_angle_array(self, latitude, solar_dec, zenith: float):
+        import numpy as np
+
+        lat_r = np.radians(latitude)
+        solar_dec_r = np.radians(solar_dec)
+        zenith_r = math.radians(zenith)
+
+        return (math.cos(zenith_r) / (np.cos(lat_r) * np.cos(solar_dec_r))) - \
+               (np.tan(lat_r) * np.tan(solar_dec_r))
+
+    def _sun_event_array(self, cos_hour_angle):
+        import numpy as np
+
+        return np.select([cos_hour_angle > 1, cos_hour_angle < -1],
+                         [self.SUN_EVENTS.always_below.value, self.SUN_EVENTS.always_above.value],
+                         self.SUN_EVENTS.event.value)
+
+    def _solar_declination_array(self, julian_centuries):
+        import numpy as np
+
+        correction = np.radians(self._obliquity_correction_array(julian_centuries))
+        apparent_longitude = np.radians(self._sun_apparent_longitude_array(julian_centuries))
+        sint = np.sin(correction) * np.sin(apparent_longitude)
+        return np.degrees(np.arcsin(sint))  # in degrees
+
+    def _sun_apparent_longitude_array(self, julian_centuries):
+        import numpy as np
+
+        true_longitude = self._sun_true_longitude_array(julian_centuries)
+        omega = 125.04 - (1934.136 * julian_centuries)
+        return true_longitude - 0.00569 - (0.00478 * np.sin(np.radians(omega)))  # in degrees
+
+    def _sun_true_longitude_array(self, julian_centuries):
+        sgml = self._sun_geometric_mean_longitude(julian_centuries)
+        center = self._sun_equation_of_center_array(julian_centuries)
+        return sgml + center  # in degrees
+
+    def _sun_equation_of_center_array(self, julian_centuries):
+        import numpy as np
+
+        mrad = np.radians(self._sun_geometric_mean_anomaly(julian_centuries))
+        sinm = np.sin(mrad)
+        sin2m = np.sin(2 * mrad)
+        sin3m = np.sin(3 * mrad)
+
+        return (sinm * (1.914602 - (julian_centuries * (0.004817 + (0.000014 * julian_centuries))))) + \
+               (sin2m * (0.019993 - (0.000101 * julian_centuries))) + \
+               (sin3m * 0.000289)  # in degrees
+
+    def _solar_noon_utc_array(self, julian_centuries, longitude):
+        century_start = self._julian_day_from_julian_centuries(julian_centuries)
+
+        # first pass to yield approximate solar noon
+        approx_tnoon = self._julian_centuries_from_julian_day(century_start + (longitude / 360.0))
+        approx_eq_time = self._equation_of_time_array(approx_tnoon)
+        approx_sol_noon = 720 + (longitude * 4) - approx_eq_time
+
+        # refinement using output of first pass
+        tnoon = self._julian_centuries_from_julian_day(century_start - 0.5 + (approx_sol_noon / 1440.0))
+        eq_time = self._equation_of_time_array(tnoon)
+        return 720 + (longitude * 4) - eq_time
+
+    def _equation_of_time_array(self, julian_centuries):
+        import numpy as np
+
+        epsilon = np.radians(self._obliquity_correction_array(julian_centuries))
+        sgml = np.radians(self._sun_geometric_mean_longitude(julian_centuries))
+        sgma = np.radians(self._sun_geometric_mean_anomaly(julian_centuries))
+        eoe = self._earth_orbit_eccentricity(julian_centuries)
+
+        y = np.tan(epsilon / 2.0)
+        y *= y
+
+        sin2l0 = np.sin(2.0 * sgml)
+        sin4l0 = np.sin(4.0 * sgml)
+        cos2l0 = np.cos(2.0 * sgml)
+        sinm = np.sin(sgma)
+        sin2m = np.sin(2.0 * sgma)
+
+        eq_time = (y * sin2l0) - (2.0 * eoe * sinm) + (4.0 * eoe * y * sinm * cos2l0) - (0.5 * y * y * sin4l0) - \
+                  (1.25 * eoe * eoe * sin2m)
+        return np.degrees(eq_time) * 4.0  # minutes of time
+
+    def _obliquity_correction_array(self, julian_centuries):
+        import numpy as np
+
+        obliquity_of_ecliptic = self._mean_obliquity_of_ecliptic(julian_centuries)
+
+        omega = 125.04 - (1934.136 * julian_centuries)
+        correction = obliquity_of_ecliptic + (0.00256 * np.cos(np.radians(omega)))
+        return correction % 360  # normalized (0...360)
@@ -0,0 +1,135 @@
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+
+# Atmospheric refraction (in degrees) by the sun's true altitude, precompiled into a table and linearly interpolated,
+# so that no trigonometry is evaluated per call. Subclasses provide the refraction at an apparent altitude.
+class RefractionModel:
+    TABLE_START = -2.0  # degrees of true altitude
+    TABLE_END = 90.0
+    TABLE_STEP = 0.05
+    TABLE_CACHE_SIZE = 64
+    PRESSURE_FACTOR_CACHE_SIZE = 1024
+
+    def __init__(self):
+        self._table = self._tabulate()
+        self._horizon_refraction = self.apparent_refraction(0.0)
+        self._pressure_factors = OrderedDict()
+
+    def __repr__(self):
+        return "%s()" % (self.__module__ + "." + self.__class__.__qualname__)
+
+    # models are equal by their parameters, so that equal models share a compiled table
+    def __eq__(self, other):
+        return type(self) is type(other) and repr(self) == repr(other)
+
+    def __hash__(self):
+        return hash(repr(self))
+
+    def apparent_refraction(self, apparent_altitude: float) -> float:
+        raise NotImplementedError
+
+    def pressure_factor(self, elevation: float) -> float:
+        return 1.0
+
+    def refraction(self, true_altitude: float, elevation: float = 0.0) -> float:
+        position = (min(max(true_altitude, self.TABLE_START), self.TABLE_END) - self.TABLE_START) / self.TABLE_STEP
+        index = min(int(position), len(self._table) - 2)
+        fraction = position - index
+        lower, upper = self._table[index], self._table[index + 1]
+        return (lower + ((upper - lower) * fraction)) * self._cached_pressure_factor(elevation)
+
+    def refraction_array(self, true_altitudes, elevation: float = 0.0):
+        import numpy as np
+
+        altitudes = self.TABLE_START + (np.arange(len(self._table)) * self.TABLE_STEP)
+        return np.interp(true_altitudes, altitudes, self._table) * self._cached_pressure_factor(elevation)
+
+    def horizon_refraction(self, elevation: float = 0.0) -> float:
+        return self._horizon_refraction * self._cached_pressure_factor(elevation)  # where the sun appears on the horizon
+
+    def _cached_pressure_factor(self, elevation: float) -> float:
+        factor = self._pressure_factors.get(elevation)
+        if factor is None:
+            factor = self._pressure_factors[elevation] = self.pressure_factor(elevation)
+            if len(self._pressure_factors) > self.PRESSURE_FACTOR_CACHE_SIZE:
+                self._pressure_factors.popitem(last=False)  # evict the least recently used
+        else:
+            self._pressure_factors.move_to_end(elevation)
+        return factor
+
+    def _tabulate(self) -> list:
+        return self._shared_table(self)
+
+    @staticmethod
+    @lru_cache(maxsize=TABLE_CACHE_SIZE)
+    def _shared_table(model: 'RefractionModel') -> list:
+        return model._compile_table()
+
+    def _compile_table(self) -> list:
+        table = []
+        for index in range(int(round((self.TABLE_END - self.TABLE_START) / self.TABLE_STEP)) + 1):
+            true_altitude = self.TABLE_START + (index * self.TABLE_STEP)
+            apparent_altitude = true_altitude
+            for _ in range(20):  # the apparent altitude is the true altitude raised by its own refraction
+                apparent_altitude = true_altitude + self.apparent_refraction(apparent_altitude)
+            table.append(apparent_altitude - true_altitude)
+        return table
+
+
+# the fixed 34 arcminutes traditionally applied at the horizon, regardless of altitude or conditions
+class ConstantRefraction(RefractionModel):
+    def __init__(self, refraction: float = 34 / 60.0):
+        self.constant = refraction
+        super().__init__()
+
+    def __repr__(self):
+        return "%s(refraction=%r)" % (self.__module__ + "." + self.__class__.__qualname__, self.constant)
+
+    def apparent_refraction(self, apparent_altitude: float) -> float:
+        return self.constant
+
+    def refraction(self, true_altitude: float, elevation: float = 0.0) -> float:
+        return self.constant
+
+    def refraction_array(self, true_altitudes, elevation: float = 0.0):
+        import numpy as np
+
+        return np.full(np.shape(true_altitudes), self.constant)
+
+    def _tabulate(self) -> None:
+        return None  # refraction does not vary with altitude, so there is nothing to interpolate
+
+
+# Bennett's formula, scaled for pressure (millibars) and temperature (celsius)
+class AtmosphericRefraction(RefractionModel):
+    def __init__(self, pressure: float = 1010.0, temperature: float = 10.0):
+        self.pressure = pressure
+        self.temperature = temperature
+        super().__init__()
+
+    def __repr__(self):
+        return "%s(pressure=%r, temperature=%r)" % \
+               (self.__module__ + "." + self.__class__.__qualname__, self.pressure, self.temperature)
+
+    def apparent_refraction(self, apparent_altitude: float) -> float:
+        apparent_altitude = max(apparent_altitude, -2.0)  # the formula diverges well below the horizon
+        minutes = max(1.0 / math.tan(math.radians(apparent_altitude + (7.31 / (apparent_altitude + 4.4)))), 0.0)  # negative near the zenith
+        return (minutes / 60.0) * (self.pressure / 1010.0) * (283.0 / (273.0 + self.temperature))
+
+
+# atmospheric refraction with the pressure falling off exponentially with the observer's elevation (meters)
+class ElevationRefraction(AtmosphericRefraction):
+    SCALE_HEIGHT = 8434.5  # meters
+
+    def __init__(self, pressure: float = 1010.0, temperature: float = 10.0, scale_height: float = SCALE_HEIGHT):
+        self.scale_height = scale_height
+        super().__init__(pressure, temperature)
+
+    def __repr__(self):
+        return "%s(pressure=%r, temperature=%r, scale_height=%r)" % \
+               (self.__module__ + "." + self.__class__.__qualname__, self.pressure, self.temperature, self.scale_height)
+
+    def pressure_factor(self, elevation: float) -> float:
+        return math.exp(-elevation / self.scale_height)
@@ -1,6 +1,6 @@
 import math
 from datetime import date
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 
 from zmanim.util.astronomical_calculations import AstronomicalCalculations
 from zmanim.util.geo_location import GeoLocation
@@ -14,16 +14,35 @@ class SunTimesCalculator(AstronomicalCalculations):
         return 'US Naval Almanac Algorithm'
 
     def utc_sunrise(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False) -> Optional[float]:
-        try:
-            return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunrise')
-        except ValueError:
-            return None
+        return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunrise')
 
     def utc_sunset(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False) -> Optional[float]:
-        try:
-            return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunset')
-        except ValueError:
-            return None
+        return self._utc_sun_position(target_date, geo_location, zenith, adjust_for_elevation, 'sunset')
+
+    def sun_event_type(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False, mode: str = 'sunrise'):
+        elevation = geo_location.elevation if adjust_for_elevation else 0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        time_days = self._approx_time_days(target_date.timetuple().tm_yday, self._hours_from_meridian(geo_location.longitude), mode)
+        true_long = self._sun_true_longitude(self._sun_mean_anomaly(time_days))
+        return self._sun_event(self._cos_local_hour_angle(true_long, geo_location.latitude, adjusted_zenith))
+
+    def utc_sunrise_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False):
+        return self._utc_sun_position_batch(target_dates, geo_location, zenith, adjust_for_elevation, 'sunrise')
+
+    def utc_sunset_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool = False):
+        return self._utc_sun_position_batch(target_dates, geo_location, zenith, adjust_for_elevation, 'sunset')
+
+    def utc_solar_noon_batch(self, target_dates: Iterable[date], geo_location: GeoLocation):
+        return self._utc_sun_transit_batch(target_dates, geo_location, 12.0, 0.0)
+
+    def utc_solar_midnight_batch(self, target_dates: Iterable[date], geo_location: GeoLocation):
+        return self._utc_sun_transit_batch(target_dates, geo_location, 24.0, 12.0)
+
+    def utc_solar_noon(self, target_date: date, geo_location: GeoLocation) -> float:
+        return self._utc_sun_transit(target_date, geo_location, 12.0, 0.0)
+
+    def utc_solar_midnight(self, target_date: date, geo_location: GeoLocation) -> float:
+        return self._utc_sun_transit(target_date, geo_location, 24.0, 12.0)
 
     def _sin_deg(self, deg: float) -> float:
         return math.sin(math.radians(deg))
@@ -43,17 +62,32 @@ class SunTimesCalculator(AstronomicalCalculations):
     def _atan_deg(self, x: float) -> float:
         return math.degrees(math.atan(x))
 
-    def _utc_sun_position(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool, mode: str) -> float:
+    def _utc_sun_position(self, target_date: date, geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool, mode: str) -> Optional[float]:
         elevation = geo_location.elevation if adjust_for_elevation else 0
-        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        return self._utc_sun_position_at_zenith(target_date, geo_location, self.adjusted_zenith(zenith, elevation), mode)
+
+    def _utc_sun_position_at_zenith(self, target_date: date, geo_location: GeoLocation, zenith: float, mode: str) -> Optional[float]:
         utc_time = self._calculate_utc_sun_position(target_date,
                                                     geo_location.latitude,
                                                     geo_location.longitude,
-                                                    adjusted_zenith,
+                                                    zenith,
                                                     mode)  # in hours
+        if utc_time is None:
+            return None
         return utc_time % 24  # normalized (0...24)
 
-    def _calculate_utc_sun_position(self, target_date: date, latitude: float, longitude: float, zenith: float, mode: str) -> float:
+    def _sun_elevation_azimuth_at(self, target_date: date, geo_location: GeoLocation, utc_hours: float) -> Tuple[float, float]:
+        time_days = target_date.timetuple().tm_yday + (utc_hours / 24)
+        true_long = self._sun_true_longitude(self._sun_mean_anomaly(time_days))
+        solar_dec = self._asin_deg(0.39782 * self._sin_deg(true_long))
+
+        # the inverse of _local_mean_time, for the local hour angle at the given time
+        mean_time = utc_hours + self._hours_from_meridian(geo_location.longitude)
+        local_hour = mean_time - self._sun_right_ascension_hours(true_long) + (0.06571 * time_days) + 6.622
+        hour_angle = (((local_hour * self.DEG_PER_HOUR) + 180.0) % 360) - 180.0  # in degrees, negative before solar noon
+        return self._sun_elevation_azimuth(geo_location.latitude, solar_dec, hour_angle)
+
+    def _calculate_utc_sun_position(self, target_date: date, latitude: float, longitude: float, zenith: float, mode: str) -> Optional[float]:
         day_of_year = target_date.timetuple().tm_yday
         hours_offset = self._hours_from_meridian(longitude)
         time_days = self._approx_time_days(day_of_year, hours_offset, mode)
@@ -62,6 +96,8 @@ class SunTimesCalculator(AstronomicalCalculations):
         true_long = self._sun_true_longitude(mean_anomaly)
         right_ascension_hours = self._sun_right_ascension_hours(true_long)
         cos_local_hour_angle = self._cos_local_hour_angle(true_long, latitude, zenith)
+        if not -1 <= cos_local_hour_angle <= 1:
+            return None  # the sun does not reach the zenith on this day
 
         local_hour_angle = self._acos_deg(cos_local_hour_angle)
         if mode == 'sunrise':
@@ -72,6 +108,92 @@ class SunTimesCalculator(AstronomicalCalculations):
         mean_time = self._local_mean_time(local_hour, right_ascension_hours, time_days)
         return mean_time - hours_offset
 
+    def _utc_sun_position_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, zenith: float, adjust_for_elevation: bool, mode: str):
+        import numpy as np
+
+        days = np.asarray(target_dates, dtype='datetime64[D]')
+        day_of_year = (days - days.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
+        elevation = geo_location.elevation if adjust_for_elevation else 0
+        adjusted_zenith = self.adjusted_zenith(zenith, elevation)
+        utc_time = self._calculate_utc_sun_position_array(day_of_year,
+                                                          geo_location.latitude,
+                                                          geo_location.longitude,
+                                                          adjusted_zenith,
+                                                          mode)  # in hours
+        return utc_time % 24  # normalized (0...24), NaN where the sun does not reach the zenith
+
+    def _calculate_utc_sun_position_array(self, day_of_year, latitude: float, longitude: float, zenith: float, mode: str):
+        import numpy as np
+
+        hours_offset = self._hours_from_meridian(longitude)
+        time_days = self._approx_time_days(day_of_year, hours_offset, mode)
+
+        mean_anomaly = self._sun_mean_anomaly(time_days)
+        true_long = self._sun_true_longitude_array(mean_anomaly)
+        right_ascension_hours = self._sun_right_ascension_hours_array(true_long)
+        cos_local_hour_angle = self._cos_local_hour_angle_array(true_long, latitude, zenith)
+        # NaN where the sun does not reach the zenith on this day
+        local_hour_angle = np.degrees(np.arccos(np.where(np.abs(cos_local_hour_angle) <= 1, cos_local_hour_angle, np.nan)))
+        if mode == 'sunrise':
+            local_hour_angle = 360.0 - local_hour_angle
+
+        local_hour = local_hour_angle / self.DEG_PER_HOUR
+
+        mean_time = self._local_mean_time(local_hour, right_ascension_hours, time_days)
+        return mean_time - hours_offset
+
+    def _cos_local_hour_angle_array(self, sun_true_long, latitude: float, zenith: float):
+        import numpy as np
+
+        sin_dec = 0.39782 * np.sin(np.radians(sun_true_long))
+        cos_dec = np.cos(np.radians(np.degrees(np.arcsin(sin_dec))))
+        return (self._cos_deg(zenith) - (sin_dec * self._sin_deg(latitude))) / (cos_dec * self._cos_deg(latitude))
+
+    def _sun_right_ascension_hours_array(self, sun_true_long):
+        import numpy as np
+
+        ra = np.degrees(np.arctan(0.91764 * np.tan(np.radians(sun_true_long))))
+        l_quadrant = np.floor(sun_true_long / 90.0) * 90.0
+        ra_quadrant = np.floor(ra / 90.0) * 90.0
+        ra += (l_quadrant - ra_quadrant)
+
+        return ra / self.DEG_PER_HOUR    # in hours
+
+    def _sun_true_longitude_array(self, sun_mean_anomaly):
+        import numpy as np
+
+        true_longitude = sun_mean_anomaly + \
+                         (1.916 * np.sin(np.radians(sun_mean_anomaly))) + \
+                         (0.02 * np.sin(np.radians(2 * sun_mean_anomaly))) + \
+                         282.634
+        return true_longitude % 360
+
+    def _utc_sun_transit(self, target_date: date, geo_location: GeoLocation, approx_local_hour: float, local_hour: float) -> float:
+        hours_offset = self._hours_from_meridian(geo_location.longitude)
+        time_days = target_date.timetuple().tm_yday + ((approx_local_hour - hours_offset) / 24)
+
+        mean_anomaly = self._sun_mean_anomaly(time_days)
+        true_long = self._sun_true_longitude(mean_anomaly)
+        right_ascension_hours = self._sun_right_ascension_hours(true_long)
+
+        mean_time = self._local_mean_time(local_hour, right_ascension_hours, time_days)
+        return (mean_time - hours_offset) % 24  # normalized (0...24)
+
+    def _utc_sun_transit_batch(self, target_dates: Iterable[date], geo_location: GeoLocation, approx_local_hour: float, local_hour: float):
+        import numpy as np
+
+        days = np.asarray(target_dates, dtype='datetime64[D]')
+        day_of_year = (days - days.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
+        hours_offset = self._hours_from_meridian(geo_location.longitude)
+        time_days = day_of_year + ((approx_local_hour - hours_offset) / 24)
+
+        mean_anomaly = self._sun_mean_anomaly(time_days)
+        true_long = self._sun_true_longitude_array(mean_anomaly)
+        right_ascension_hours = self._sun_right_ascension_hours_array(true_long)
+
+        mean_time = self._local_mean_time(local_hour, right_ascension_hours, time_days)
+        return (mean_time - hours_offset) % 24  # normalized (0...24)
+
     def _local_mean_time(self, local_hour: float, right_ascension_hours: float, time_days: float) -> float:
         return local_hour + right_ascension_hours - (0.06571 * time_days) - 6.622
 
@@ -0,0 +1,250 @@
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+from zmanim.util.math_helper import MathHelper
+
+
+# Declarative description of a zman: either a base solar event (optionally at a depression in degrees), or a number of
+# shaos zmaniyos into the day between two other zmanim, followed by a fixed or zmaniyos offset in minutes.
+# A day_start/day_end pair without shaos describes the shaah zmanis (in milliseconds) of that day.
+class ZmanSpec:
+    EVENTS = ('sunrise', 'sunset', 'sea_level_sunrise', 'sea_level_sunset', 'noon', 'midnight')
+    GEOMETRIC_ZENITH = 90
+
+    def __init__(self, event: Optional[str] = None, degrees: float = 0.0, offset: Union[float, Callable] = 0.0, zmanis_offset: float = 0.0,
+                 day_start: Optional[str] = None, day_end: Optional[str] = None, shaos: Optional[float] = None):
+        if (event is None) == (day_start is None or day_end is None):
+            raise ValueError("a zman spec needs either a base event or a day_start and day_end")
+        if event is not None and event not in self.EVENTS:
+            raise ValueError("event must be one of %s" % ', '.join(self.EVENTS))
+        if degrees != 0 and event not in ('sunrise', 'sunset'):
+            raise ValueError("degrees only apply to sunrise and sunset events")
+        if offset != 0 and zmanis_offset != 0:
+            raise ValueError("a zman spec takes either an offset or a zmanis_offset")
+        if event is None and shaos is None and (offset != 0 or zmanis_offset != 0):
+            raise ValueError("a shaah zmanis cannot be offset")
+        self.event = event
+        self.degrees = degrees
+        self.offset = offset  # minutes, or a callable of the calendar returning minutes
+        self.zmanis_offset = zmanis_offset
+        self.day_start = day_start
+        self.day_end = day_end
+        self.shaos = shaos
+
+    def __repr__(self):
+        fields = ['event', 'degrees', 'offset', 'zmanis_offset', 'day_start', 'day_end', 'shaos']
+        return "%s(%s)" % (self.__module__ + "." + self.__class__.__qualname__,
+                           ', '.join('%s=%r' % (field, getattr(self, field)) for field in fields))
+
+    @classmethod
+    def from_opts(cls, event: str, opts: dict) -> 'ZmanSpec':
+        # the `opts` dicts taken by ZmanimCalendar.alos and tzais, where offsets before sunrise are given as positive minutes
+        degrees, offset, zmanis_offset = opts.get('degrees', 0), opts.get('offset', 0), opts.get('zmanis_offset', 0)
+        sign = -1 if event in ('sunrise', 'sea_level_sunrise') else 1
+        return cls(event, degrees=degrees, offset=sign * offset, zmanis_offset=sign * zmanis_offset)
+
+
+# Named zman specs, compiled on request into plans that evaluate each shared dependency once per day
+class ZmanRegistry:
+    ZMANIS_DAY = ('hanetz', 'shkia')  # zmanis offsets are scaled by the shaah zmanis between these (GRA)
+
+    _default = None
+
+    def __init__(self, specs: Optional[dict] = None):
+        self.specs = dict(specs or {})
+        self._plans = {}
+
+    def __repr__(self):
+        return "%s(names=%r)" % (self.__module__ + "." + self.__class__.__qualname__, sorted(self.specs))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+
+    @classmethod
+    def default(cls) -> 'ZmanRegistry':
+        if cls._default is None:
+            cls._default = cls.standard()
+        return cls._default
+
+    @classmethod
+    def standard(cls) -> 'ZmanRegistry':
+        return cls({
+            'hanetz': ZmanSpec('sunrise'),
+            'shkia': ZmanSpec('sunset'),
+            'alos': ZmanSpec('sunrise', degrees=16.1),
+            'alos_72': ZmanSpec('sunrise', offset=-72),
+            'tzais': ZmanSpec('sunset', degrees=8.5),
+            'tzais_72': ZmanSpec('sunset', offset=72),
+            'chatzos': ZmanSpec('noon'),
+            'candle_lighting': ZmanSpec('sea_level_sunset', offset=lambda calendar: -calendar.candle_lighting_offset),
+            'sof_zman_shma_gra': ZmanSpec(day_start='hanetz', day_end='shkia', shaos=3),
+            'sof_zman_shma_mga': ZmanSpec(day_start='alos_72', day_end='tzais_72', shaos=3),
+            'sof_zman_tfila_gra': ZmanSpec(day_start='hanetz', day_end='shkia', shaos=4),
+            'sof_zman_tfila_mga': ZmanSpec(day_start='alos_72', day_end='tzais_72', shaos=4),
+            'mincha_gedola': ZmanSpec(day_start='hanetz', day_end='shkia', shaos=6.5),
+            'mincha_ketana': ZmanSpec(day_start='hanetz', day_end='shkia', shaos=9.5),
+            'plag_hamincha': ZmanSpec(day_start='hanetz', day_end='shkia', shaos=10.75),
+            'shaah_zmanis_gra': ZmanSpec(day_start='hanetz', day_end='shkia'),
+            'shaah_zmanis_mga': ZmanSpec(day_start='alos_72', day_end='tzais_72'),
+        })
+
+    def names(self) -> list:
+        return list(self.specs)
+
+    def register(self, name: str, spec: ZmanSpec):
+        self.specs[name] = spec
+        self._plans.clear()  # compiled plans may depend on the previous spec
+
+    def unregister(self, name: str):
+        del self.specs[name]
+        self._plans.clear()
+
+    def compile(self, names: Iterable[str]) -> 'ZmanPlan':
+        names = tuple(names)
+        if names not in self._plans:
+            self._plans[names] = ZmanPlan(self, names)
+        return self._plans[names]
+
+
+# Dependency-ordered evaluation steps for a set of zmanim. Base events are keyed by their solar position, so zmanim
+# sharing an event, a day or a shaah zmanis evaluate it once, and all distinct zeniths are solved in a single pass.
+class ZmanPlan(MathHelper):
+    def __init__(self, registry: ZmanRegistry, names: Tuple[str, ...]):
+        self.names = names
+        self.steps = []  # (key, operation name, arguments) with dependencies first
+        self.zeniths = {}  # (mode, adjust_for_elevation) -> zeniths to solve together
+        self._keys = set()
+        for name in names:
+            self._add_zman(registry, name, ())
+
+    def __repr__(self):
+        return "%s(names=%r, steps=%r)" % (self.__module__ + "." + self.__class__.__qualname__, self.names, len(self.steps))
+
+    def evaluate(self, calendar) -> dict:
+        values = self._evaluate(calendar)
+        return {name: values[name] for name in self.names}
+
+    def evaluate_row(self, calendar) -> tuple:
+        values = self._evaluate(calendar)
+        return tuple(values[name] for name in self.names)
+
+    def _evaluate(self, calendar) -> dict:
+        # once use_elevation is known, elevation adjusted and sea level zeniths may share a pass
+        passes = {}
+        for (mode, adjust_for_elevation), zeniths in self.zeniths.items():
+            adjust_for_elevation = calendar.use_elevation if adjust_for_elevation is None else adjust_for_elevation
+            passes.setdefault((mode, adjust_for_elevation), {}).update(dict.fromkeys(zeniths))
+        for (mode, adjust_for_elevation), zeniths in passes.items():
+            calendar._prefetch_sun_positions(mode, zeniths, adjust_for_elevation)
+        values = {}
+        for key, operation, arguments in self.steps:
+            values[key] = getattr(self, operation)(calendar, values, *arguments)
+        return values
+
+    def evaluate_columns(self, calendar, dates) -> dict:
+        # every zman for every date as float UTC epoch seconds (shaos zmaniyos in milliseconds), NaN where it does not occur
+        import numpy as np
+
+        days = np.asarray(dates, dtype='datetime64[D]')
+        values = {}
+        for key, operation, arguments in self.steps:
+            values[key] = getattr(self, operation + '_array')(calendar, values, days, *arguments)
+        return {name: values[name] for name in self.names}
+
+    def _add_zman(self, registry: ZmanRegistry, name: str, path: tuple):
+        if name in self._keys:
+            return
+        if name in path:
+            raise ValueError("circular zman dependency: %s" % ' -> '.join(path + (name,)))
+        if name not in registry:
+            raise ValueError("unknown zman %r" % name)
+        spec = registry.specs[name]
+        path += (name,)
+
+        if spec.event is not None:
+            base = self._add_event(spec)
+        else:
+            self._add_zman(registry, spec.day_start, path)
+            self._add_zman(registry, spec.day_end, path)
+            base = self._add_shaah_zmanis(spec.day_start, spec.day_end)
+        zmanis_hours = None
+        if spec.zmanis_offset != 0:
+            for dependency in registry.ZMANIS_DAY:
+                self._add_zman(registry, dependency, path)
+            zmanis_hours = self._add_shaah_zmanis(*registry.ZMANIS_DAY)
+        self._add_step(name, '_zman', (spec, base, zmanis_hours))
+
+    def _add_event(self, spec: ZmanSpec) -> tuple:
+        if spec.event in ('noon', 'midnight'):
+            key = (spec.event, None, False)
+        else:
+            mode = spec.event.replace('sea_level_', '')
+            # the elevation adjusted sunrise and sunset follow the calendar's use_elevation, decided when evaluated
+            adjust_for_elevation = None if spec.event in ('sunrise', 'sunset') and spec.degrees == 0 else False
+            key = (mode, ZmanSpec.GEOMETRIC_ZENITH + spec.degrees, adjust_for_elevation)
+            zeniths = self.zeniths.setdefault((mode, adjust_for_elevation), [])
+            if key[1] not in zeniths:
+                zeniths.append(key[1])
+        self._add_step(('event',) + key, '_event', key)
+        return ('event',) + key
+
+    def _add_shaah_zmanis(self, day_start: str, day_end: str) -> tuple:
+        key = ('shaah_zmanis', day_start, day_end)
+        self._add_step(key, '_shaah_zmanis', (day_start, day_end))
+        return key
+
+    def _add_step(self, key, operation: str, arguments: tuple):
+        if key not in self._keys:
+            self._keys.add(key)
+            self.steps.append((key, operation, arguments))
+
+    @staticmethod
+    def _event(calendar, values: dict, mode: str, zenith: Optional[float], adjust_for_elevation: Optional[bool]):
+        adjust_for_elevation = calendar.use_elevation if adjust_for_elevation is None else adjust_for_elevation
+        return calendar._sun_position(mode, zenith, adjust_for_elevation)
+
+    @staticmethod
+    def _shaah_zmanis(calendar, values: dict, day_start: str, day_end: str) -> Optional[float]:
+        return calendar.temporal_hour(values[day_start], values[day_end])
+
+    @classmethod
+    def _zman(cls, calendar, values: dict, spec: ZmanSpec, base: tuple, zmanis_hours: Optional[tuple]):
+        if spec.event is not None:
+            time = values[base]
+        elif spec.shaos is None:
+            return values[base]  # the shaah zmanis itself
+        else:
+            shaah_zmanis = values[base]
+            if shaah_zmanis is None:
+                return None
+            time = calendar._offset_by_minutes(values[spec.day_start], (shaah_zmanis / cls.MINUTE_MILLIS) * spec.shaos)
+
+        if zmanis_hours is not None:
+            shaah_zmanis = values[zmanis_hours]
+            if time is None or shaah_zmanis is None:
+                return None
+            return calendar._offset_by_minutes(time, spec.zmanis_offset * (shaah_zmanis / cls.HOUR_MILLIS))
+        offset = spec.offset(calendar) if callable(spec.offset) else spec.offset
+        return calendar._offset_by_minutes(time, offset)
+
+    @staticmethod
+    def _event_array(calendar, values: dict, days, mode: str, zenith: Optional[float], adjust_for_elevation: Optional[bool]):
+        adjust_for_elevation = calendar.use_elevation if adjust_for_elevation is None else adjust_for_elevation
+        return calendar._sun_position_timestamps(days, mode, zenith, adjust_for_elevation)
+
+    @classmethod
+    def _shaah_zmanis_array(cls, calendar, values: dict, days, day_start: str, day_end: str):
+        return ((values[day_end] - values[day_start]) / 3600.0 / 12) * cls.HOUR_MILLIS
+
+    @classmethod
+    def _zman_array(cls, calendar, values: dict, days, spec: ZmanSpec, base: tuple, zmanis_hours: Optional[tuple]):
+        if spec.event is not None:
+            time = values[base]
+        elif spec.shaos is None:
+            return values[base]  # the shaah zmanis itself
+        else:
+            time = values[spec.day_start] + ((values[base] / cls.MINUTE_MILLIS) * spec.shaos * 60.0)
+
+        if zmanis_hours is not None:
+            return time + (spec.zmanis_offset * (values[zmanis_hours] / cls.HOUR_MILLIS) * 60.0)
+        offset = spec.offset(calendar) if callable(spec.offset) else spec.offset
+        return time + (offset * 60.0)
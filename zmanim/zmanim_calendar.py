@@ -1,11 +1,18 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from copy import copy
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Union
 
 from zmanim.astronomical_calendar import AstronomicalCalendar
+from zmanim.daily_zmanim import DailyZmanim
 from zmanim.hebrew_calendar.jewish_calendar import JewishCalendar
+from zmanim.util.geo_location import GeoLocation
+from zmanim.zman_registry import ZmanRegistry
 
 
 class ZmanimCalendar(AstronomicalCalendar):
+    DEFAULT_CHUNK_SIZE = 366
+
     def __init__(self, candle_lighting_offset: int = None, *args, **kwargs):
         super(ZmanimCalendar, self).__init__(*args, **kwargs)
         self.candle_lighting_offset = 18 if candle_lighting_offset is None else candle_lighting_offset
@@ -111,18 +118,97 @@ class ZmanimCalendar(AstronomicalCalendar):
         opts = {'degrees': degrees, 'offset': offset}
         return self.shaah_zmanis(self.alos(opts), self.tzais(opts))
 
-    def is_assur_bemelacha(self, current_time: datetime, tzais=None, in_israel: Optional[bool]=False):
+    def zmanim(self, names: Iterable[str], registry: Optional[ZmanRegistry] = None) -> dict:
+        registry = ZmanRegistry.default() if registry is None else registry
+        return registry.compile(names).evaluate(self)
+
+    def all_zmanim(self, registry: Optional[ZmanRegistry] = None) -> DailyZmanim:
+        return DailyZmanim(self.date, self.zmanim(DailyZmanim.ZMANIM, registry))
+
+    def zmanim_rows(self, start_date: date, end_date: date, names: Iterable[str], registry: Optional[ZmanRegistry] = None,
+                    locations: Optional[Iterable[GeoLocation]] = None) -> Iterator[tuple]:
+        # lazily yields (date, *zmanim) for each day, or (location, date, *zmanim) when given locations,
+        # reusing a single calendar and compiled plan so that memory stays constant over any range
+        registry = ZmanRegistry.default() if registry is None else registry
+        plan = registry.compile(names)
+        calendar = copy(self)
+        for location in ([None] if locations is None else locations):
+            if location is not None:
+                calendar.geo_location = location
+            for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1):
+                calendar.date = date.fromordinal(ordinal)
+                row = (calendar.date,) + plan.evaluate_row(calendar)
+                yield row if location is None else (location,) + row
+
+    def zmanim_chunks(self, start_date: date, end_date: date, names: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      registry: Optional[ZmanRegistry] = None, locations: Optional[Iterable[GeoLocation]] = None) -> Iterator[List[tuple]]:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        rows = self.zmanim_rows(start_date, end_date, names, registry, locations)
+        chunk = list(islice(rows, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(rows, chunk_size))
+
+    def zmanim_columns(self, dates: Iterable[date], names: Iterable[str], out=None, mask=None, registry: Optional[ZmanRegistry] = None):
+        # one column per zman, written into `out` (a 2-d array or a sequence of float64 buffers such as numpy arrays or
+        # array.array('d')) with `mask` (bool buffers) flagging the dates where the zman occurs. zmanim are float UTC epoch
+        # seconds, while shaah zmanis columns are durations in milliseconds, as returned by the scalar methods
+        import numpy as np
+
+        registry = ZmanRegistry.default() if registry is None else registry
+        plan = registry.compile(names)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        if out is None:
+            out = np.empty((len(plan.names), len(dates)), dtype=np.float64)
+        if mask is None:
+            mask = np.empty((len(plan.names), len(dates)), dtype=np.bool_)
+        if len(out) != len(plan.names) or len(mask) != len(plan.names):
+            raise ValueError("out and mask need one column per zman")
+
+        columns = plan.evaluate_columns(self, dates)
+        for index, name in enumerate(plan.names):
+            values = columns[name]
+            valid = self._writable_column(mask[index], np.bool_, len(dates))
+            np.logical_not(np.isnan(values), out=valid)
+            np.copyto(self._writable_column(out[index], np.float64, len(dates)), values)
+        return out, mask
+
+    def is_assur_bemelacha(self, current_time: Union[datetime, float], tzais=None, in_israel: Optional[bool]=False):
         if tzais is None:
             tzais_time = self.tzais()
         elif isinstance(tzais, dict):
             tzais_time = self.tzais(tzais)
         else:
             tzais_time = tzais
-        jewish_calendar = JewishCalendar(current_time.date())
+        if self.output_mode == 'timestamp':
+            if isinstance(current_time, datetime):
+                current_time = current_time.timestamp()
+            if isinstance(tzais_time, datetime):
+                tzais_time = tzais_time.timestamp()
+            # a bare timestamp carries no date, so read it on the local calendar
+            current_date = self.date_time_from_timestamp(current_time).date()
+        else:
+            current_date = current_time.date()
+        jewish_calendar = JewishCalendar(current_date)
         jewish_calendar.in_israel = in_israel
         return (current_time <= tzais_time and jewish_calendar.is_assur_bemelacha()) or \
                (current_time >= self.elevation_adjusted_sunset() and jewish_calendar.is_tomorrow_assur_bemelacha())
 
+    def _writable_column(self, buffer, dtype, length: int):
+        import numpy as np
+
+        dtype = np.dtype(dtype)
+        if isinstance(buffer, np.ndarray):
+            column = buffer
+        elif memoryview(buffer).format == dtype.char:
+            column = np.frombuffer(buffer, dtype=dtype)
+        else:
+            column = None  # other buffer formats would be reinterpreted rather than converted
+        if column is None or column.dtype != dtype or column.shape != (length,):
+            raise ValueError("each column must be a buffer of %d %s values" % (length, dtype.name))
+        return column
+
     def _shaos_into_day(self, day_start: Optional[datetime], day_end: Optional[datetime], shaos: float) -> Optional[datetime]:
         shaah_zmanis = self.temporal_hour(day_start, day_end)
         if shaah_zmanis is None:
@@ -138,10 +224,12 @@ class ZmanimCalendar(AstronomicalCalendar):
     def _offset_by_minutes(self, time: Optional[datetime], minutes: float) -> Optional[datetime]:
         if time is None:
             return None
+        if not isinstance(time, datetime):
+            return time + (minutes * 60.0)
         return time + timedelta(minutes=minutes)
 
     def _offset_by_minutes_zmanis(self, time: Optional[datetime], minutes: float) -> Optional[datetime]:
         if time is None:
             return None
         shaah_zmanis_skew = self.shaah_zmanis_gra() / self.HOUR_MILLIS
-        return time + timedelta(minutes=minutes*shaah_zmanis_skew)
+        return self._offset_by_minutes(time, minutes*shaah_zmanis_skew)
@@ -0,0 +1,121 @@
+from bisect import bisect_right
+from copy import copy
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional, Tuple, Union
+
+from zmanim.hebrew_calendar.jewish_calendar import JewishCalendar
+from zmanim.zman_registry import ZmanRegistry
+from zmanim.zmanim_calendar import ZmanimCalendar
+
+
+# Sorted (instant, zman, date) events over a rolling window of days, answering which zman most recently passed and
+# which comes next by bisection. Instants are float UTC epoch seconds. Candle lighting and havdalah are added on the
+# days the Jewish calendar calls for them. Once a query reaches the last day of the window, the window rolls forward
+# by whole days, evaluating only the new days.
+class ZmanimTimeline:
+    DEFAULT_ZMANIM = ('alos', 'hanetz', 'sof_zman_shma_mga', 'sof_zman_shma_gra', 'sof_zman_tfila_mga', 'sof_zman_tfila_gra',
+                      'chatzos', 'mincha_gedola', 'mincha_ketana', 'plag_hamincha', 'shkia', 'tzais')
+    DEFAULT_DAYS = 3
+
+    def __init__(self, zmanim_calendar: ZmanimCalendar, jewish_calendar: Optional[JewishCalendar] = None, names: Iterable[str] = DEFAULT_ZMANIM,
+                 days: int = DEFAULT_DAYS, registry: Optional[ZmanRegistry] = None):
+        if days < 2:
+            raise ValueError("a timeline needs at least two days to roll forward")
+        registry = ZmanRegistry.default() if registry is None else registry
+        self.names = tuple(names)
+        self.days = days
+        self.calendar = copy(zmanim_calendar)
+        self.calendar.output_mode = 'timestamp'
+        # candle lighting and havdalah need these beyond the requested zmanim
+        self._plan = registry.compile(self.names + tuple(name for name in ('candle_lighting', 'tzais') if name not in self.names))
+
+        # the window starts a day early, so the period before alos is known to follow the previous night's zmanim
+        first_date = self._to_date(zmanim_calendar.date) - timedelta(days=1)
+        self.jewish_calendar = JewishCalendar(first_date) if jewish_calendar is None else copy(jewish_calendar)
+        self.jewish_calendar.date = first_date
+        self.first_date = first_date
+        self.last_date = first_date - timedelta(days=1)
+        self.instants = []
+        self.events = []  # (zman, date), parallel to instants
+        for _ in range(days):
+            self._append_day()
+
+    def __repr__(self):
+        return "%s(first_date=%r, last_date=%r, events=%r)" % \
+               (self.__module__ + "." + self.__class__.__qualname__, self.first_date, self.last_date, len(self.instants))
+
+    def current(self, now: Union[datetime, float]) -> Optional[Tuple[float, str, date]]:
+        index = self._index(now)
+        if index == 0:
+            return None
+        return (self.instants[index - 1],) + self.events[index - 1]
+
+    def next(self, now: Union[datetime, float]) -> Optional[Tuple[float, str, date]]:
+        index = self._index(now)
+        if index == len(self.instants):
+            return None
+        return (self.instants[index],) + self.events[index]
+
+    def remaining(self, now: Union[datetime, float]) -> Optional[float]:
+        upcoming = self.next(now)
+        return None if upcoming is None else upcoming[0] - self._timestamp(now)  # seconds
+
+    def status(self, now: Union[datetime, float]) -> Tuple[Optional[Tuple[float, str, date]], Optional[Tuple[float, str, date]], Optional[float]]:
+        index = self._index(now)
+        current = None if index == 0 else (self.instants[index - 1],) + self.events[index - 1]
+        upcoming = None if index == len(self.instants) else (self.instants[index],) + self.events[index]
+        return current, upcoming, (None if upcoming is None else upcoming[0] - self._timestamp(now))
+
+    def date_time(self, instant: Optional[float]) -> Optional[datetime]:
+        return self.calendar.date_time_from_timestamp(instant)
+
+    def advance(self, now: Union[datetime, float]):
+        # keeps the window a full day ahead of now, dropping the oldest day for every day added
+        now = self._timestamp(now)
+        while now >= self._horizon:
+            self._append_day()
+            self._drop_day()
+
+    def _index(self, now: Union[datetime, float]) -> int:
+        now = self._timestamp(now)
+        if now >= self._horizon:
+            self.advance(now)
+        return bisect_right(self.instants, now)
+
+    def _append_day(self):
+        self.last_date += timedelta(days=1)
+        if self.last_date != self.first_date:
+            self.jewish_calendar.forward()
+        self.calendar.date = self.last_date
+        values = dict(zip(self._plan.names, self._plan.evaluate_row(self.calendar)))
+
+        events = [(values[name], name) for name in self.names]
+        if self.jewish_calendar.has_delayed_candle_lighting():
+            events.append((values['tzais'], 'candle_lighting'))  # lit only once the previous day ends
+        elif self.jewish_calendar.has_candle_lighting():
+            events.append((values['candle_lighting'], 'candle_lighting'))
+        if self.jewish_calendar.is_assur_bemelacha() and not self.jewish_calendar.is_tomorrow_assur_bemelacha():
+            events.append((values['tzais'], 'havdalah'))
+
+        for instant, name in sorted((event for event in events if event[0] is not None), key=lambda event: event[0]):
+            if self.instants and instant < self.instants[-1]:
+                index = bisect_right(self.instants, instant)  # overlaps the previous day near the poles
+            else:
+                index = len(self.instants)
+            self.instants.insert(index, instant)
+            self.events.insert(index, (name, self.last_date))
+        self._horizon = datetime.combine(self.last_date, time(), tzinfo=self.calendar.geo_location.time_zone).timestamp()
+
+    def _drop_day(self):
+        kept = [index for index, (_, event_date) in enumerate(self.events) if event_date != self.first_date]
+        self.instants = [self.instants[index] for index in kept]
+        self.events = [self.events[index] for index in kept]
+        self.first_date += timedelta(days=1)
+
+    @staticmethod
+    def _timestamp(now: Union[datetime, float]) -> float:
+        return now.timestamp() if isinstance(now, datetime) else now
+
+    @staticmethod
+    def _to_date(value: Union[date, datetime]) -> date:
+        return value.date() if isinstance(value, datetime) else value